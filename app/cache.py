@@ -0,0 +1,245 @@
+import hashlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, List
+
+from fastapi import Request, Response
+
+from .db.main import reads_primary
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry, with an optional expiry per entry"""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            return default
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self.entries[key]
+            return default
+
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, expires_at: float = None) -> None:
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self.entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# Namespaces a cached response can depend on. Every key carries the current
+# generation of each of its namespaces, so bumping a generation orphans the
+# entries built before it and they age out of the backend on their own
+CATALOGUE = "catalogue"
+COURSES = "courses"
+
+
+def course_namespace(course_uid) -> str:
+    try:
+        return f"course:{uuid.UUID(str(course_uid))}"
+    except ValueError:
+        return f"course:{course_uid}"
+
+
+def request_key(request: Request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def weak_etag(request: Request, version) -> str:
+    """Weak ETag over the route, its query and a version read from the database"""
+    digest = hashlib.blake2b(f"{request_key(request)}|{version!r}".encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether If-None-Match holds etag, using the weak comparison RFC 9110 prescribes for GET"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag.removeprefix("W/") for candidate in header.split(","))
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+class MemoryBackend:
+    """Responses and generations held in this worker only; other workers see a write once their entries expire"""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int) -> None:
+        self.entries = LRUCache(maxsize)
+        self.generation = {}
+
+    async def generations(self, namespaces: List[str]) -> List[int]:
+        return [self.generation.get(namespace, 0) for namespace in namespaces]
+
+    async def bump(self, namespaces: List[str]) -> None:
+        for namespace in namespaces:
+            self.generation[namespace] = self.generation.get(namespace, 0) + 1
+
+    async def get(self, key: str):
+        return self.entries.get(key)
+
+    async def set(self, key: str, body: bytes, ttl: int) -> None:
+        self.entries.set(key, body, time.time() + ttl)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class RedisBackend:
+    """Responses and generations shared by every worker through Redis"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "legalpadi:") -> None:
+        from redis import asyncio as aioredis
+
+        self.redis = aioredis.from_url(url)
+        self.prefix = prefix
+
+    async def generations(self, namespaces: List[str]) -> List[int]:
+        values = await self.redis.mget([f"{self.prefix}gen:{namespace}" for namespace in namespaces])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, namespaces: List[str]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                pipe.incr(f"{self.prefix}gen:{namespace}")
+            await pipe.execute()
+
+    async def get(self, key: str):
+        return await self.redis.get(f"{self.prefix}response:{key}")
+
+    async def set(self, key: str, body: bytes, ttl: int) -> None:
+        await self.redis.set(f"{self.prefix}response:{key}", body, ex=ttl)
+
+
+class ResponseCache:
+    """Caches rendered JSON responses per route and query string.
+
+    A response is stored under the generations its namespaces had before it
+    was computed, so a write that bumps one while the response is being
+    built leaves the stale body under a key nobody reads. A failing backend
+    is counted and treated as a miss. Sessions only take a connection at
+    their first query, so a hit never touches the pool.
+    """
+
+    def __init__(self, backend, ttl: int) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def fetch(self, request: Request, namespaces: List[str], compute: Callable[[], Awaitable], response_model, version: Callable[[], Awaitable] = None) -> Response:
+        """Returns the cached response for this request, or computes, renders and stores it.
+
+        With a version, the response carries a weak ETag and is stored along
+        with it. A plain GET that hits is answered from the cache alone; a
+        conditional GET, or a miss, reads the version first, answers 304 when
+        If-None-Match still holds, and only serves a cached body whose ETag
+        is the current one.
+        """
+        entry = None
+        key = None
+        if self.backend is not None:
+            try:
+                generations = await self.backend.generations(namespaces)
+                key = ",".join(f"{namespace}@{generation}" for namespace, generation in zip(namespaces, generations))
+                key = f"{key}|{request_key(request)}"
+                # A client that has just written skips the lookup, in case this worker missed the invalidation
+                if not reads_primary(request):
+                    entry = await self.backend.get(key)
+            except Exception as e:
+                self.errors += 1
+                logging.exception(e)
+
+        cached_etag, _, body = entry.partition(b"\n") if entry is not None else (b"", b"", None)
+        etag = cached_etag.decode() or None
+
+        if version is not None and (entry is None or "if-none-match" in request.headers):
+            etag = weak_etag(request, await version())
+            if not_modified(request, etag):
+                return not_modified_response(etag)
+            if cached_etag.decode() != etag:
+                body = None
+
+        headers = {"ETag": etag} if etag is not None else {}
+        if body is not None:
+            self.hits += 1
+            return Response(body, media_type="application/json", headers={**headers, "X-Cache": "HIT"})
+
+        body = self.render(await compute(), response_model)
+        if self.backend is None:
+            return Response(body, media_type="application/json", headers=headers)
+
+        self.misses += 1
+        if key is not None:
+            try:
+                await self.backend.set(key, f"{etag or ''}\n".encode() + body, self.ttl)
+            except Exception as e:
+                self.errors += 1
+                logging.exception(e)
+        return Response(body, media_type="application/json", headers={**headers, "X-Cache": "MISS"})
+
+    @staticmethod
+    def render(value, response_model) -> bytes:
+        return response_model.model_validate(value, from_attributes=True).model_dump_json().encode()
+
+    async def invalidate(self, *namespaces: str) -> None:
+        if self.backend is None:
+            return
+        self.invalidations += 1
+        try:
+            await self.backend.bump(list(namespaces))
+        except Exception as e:
+            self.errors += 1
+            logging.exception(e)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend is not None else None,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "entries": len(self.backend) if isinstance(self.backend, MemoryBackend) else None,
+        }
+
+
+def build_response_cache(backend: str, size: int, ttl: int, redis_url: str = None) -> ResponseCache:
+    if backend == "redis":
+        return ResponseCache(RedisBackend(redis_url), ttl)
+    if backend == "memory":
+        return ResponseCache(MemoryBackend(size), ttl)
+    return ResponseCache(None, ttl)
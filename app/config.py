@@ -1,12 +1,36 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
 
 
 class Settings(BaseSettings):
     DOMAIN_URL: str
 
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT: int = 30000
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DB_READ_YOUR_WRITES_SECONDS: int = 5
+    # version, warn, create_all or none; unset means warn on Vercel, which never runs build.sh, and version elsewhere
+    DB_SCHEMA_CHECK: Optional[str] = None
+    VERCEL: bool = False
     SECRET_KEY: str
     ALGORITHM: str
+    AUTH_STATELESS: bool = True
+    TOKEN_CACHE_SIZE: int = 10000
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    REVOKED_TOKEN_SYNC_SECONDS: float = 1.0
+    REVOKED_TOKEN_PURGE_SECONDS: int = 3600
+    REVOKED_TOKEN_BLOOM_CAPACITY: int = 100000
+    LIKES_RECONCILE_SECONDS: int = 3600
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_SIZE: int = 2048
+    RESPONSE_CACHE_TTL: int = 30
+    REDIS_URL: Optional[str] = None
 
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
@@ -1,31 +1,219 @@
-from sqlmodel import create_engine, text, SQLModel 
-from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import text, SQLModel
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from app.config import settings
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
+from fastapi import Request, Response
+from typing import AsyncGenerator
+import logging
+import time
+
+
+class PoolStats:
+    """Counts connection checkouts and the new connections the pool had to open,
+    and how long checkouts waited for a free connection"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.connects = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        self.waits += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that times how long each checkout waits for a connection.
+
+    The time spent opening a new connection is left out, so the wait is the
+    time a request was held up because the pool was exhausted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        record = super()._create_connection()
+        record.info["connect_seconds"] = time.perf_counter() - start
+        return record
+
+    def _do_get(self):
+        start = time.perf_counter()
+        record = super()._do_get()
+        elapsed = time.perf_counter() - start
+        self.stats.record_wait(max(elapsed - record.info.pop("connect_seconds", 0.0), 0.0))
+        return record
+
+
+engines = {}
+pool_stats = {}
+
+
+def build_engine(url: str, name: str = "primary") -> AsyncEngine:
+    """Creates an async engine with the pool and timeout settings from the config"""
+    drivername = make_url(url).drivername
+    options = {}
+    connect_args = {}
+
+    if not drivername.startswith("sqlite"):
+        options = {
+            "poolclass": TimedQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+
+    if drivername == "postgresql+asyncpg":
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)}
+    elif drivername.startswith("postgresql+psycopg"):
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT}"
+
+    new_engine = create_async_engine(url, connect_args=connect_args, **options)
+    stats = getattr(new_engine.pool, "stats", None) or PoolStats()
+
+    @event.listens_for(new_engine.sync_engine, "checkout")
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.checkouts += 1
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def count_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+    engines[name] = new_engine
+    pool_stats[name] = stats
+    return new_engine
 
-engine = AsyncEngine(
-    create_engine(
-        url=settings.DATABASE_URL
-    )
+
+engine = build_engine(settings.DATABASE_URL)
+
+# Reads go to the replica when one is configured, otherwise to the primary
+replica_engine = build_engine(settings.DATABASE_REPLICA_URL, "replica") if settings.DATABASE_REPLICA_URL else engine
+
+Session = sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    expire_on_commit=False
 )
 
+ReadSession = sessionmaker(
+    bind=replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+# Set after a commit so the same client keeps reading from the primary until the replica catches up
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+# Alembic revision the models match. Bump it together with every new migration in migrations/versions
+SCHEMA_REVISION = "0007"
+
 
 async def init_db():
-    async with engine.begin() as conn:
-        from app.models import (User, Course, Tag, CourseTag, RevokedToken)
+    """Prepares the schema on startup according to DB_SCHEMA_CHECK.
 
-        await conn.run_sync(SQLModel.metadata.create_all)
+    "version" (the default) only reads the alembic_version row and refuses to
+    start on a mismatch, "warn" logs the mismatch and starts anyway (the default
+    on Vercel, where nothing runs the migrations before the app), "create_all"
+    issues SQLModel.metadata.create_all as before, and "none" skips the
+    database entirely.
+    """
+    mode = settings.DB_SCHEMA_CHECK or ("warn" if settings.VERCEL else "version")
+    if mode == "create_all":
+        async with engine.begin() as conn:
+            from app.models import (User, Course, Tag, CourseTag, RevokedToken)
 
-from typing import AsyncGenerator
+            await conn.run_sync(SQLModel.metadata.create_all)
+    elif mode in ("version", "warn"):
+        await check_schema_version(strict=mode == "version")
+
+
+async def check_schema_version(strict: bool = True):
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            revisions = set(result.scalars())
+        except DBAPIError:
+            # No alembic_version table: the database has never been migrated
+            revisions = set()
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    if SCHEMA_REVISION not in revisions:
+        message = (
+            f"Database schema is at {sorted(revisions) or 'no revision'}, expected {SCHEMA_REVISION}. "
+            "Run `alembic upgrade head` (or `alembic stamp 0001` on a database created by create_all)."
+        )
+        if strict:
+            raise RuntimeError(message)
+        logging.warning(message)
 
-    Session = sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
 
+def get_pool_status(name: str = "primary") -> dict:
+    pool = engines[name].pool
+    stats = pool_stats[name]
+    status = {"pool": pool.status()}
+
+    if hasattr(pool, "checkedout"):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+
+    status.update({
+        "checkouts": stats.checkouts,
+        "connects": stats.connects,
+    })
+
+    if isinstance(pool, TimedQueuePool):
+        status.update({
+            "waits": stats.waits,
+            "avg_wait_ms": round(stats.wait_total / stats.waits * 1000, 3) if stats.waits else 0.0,
+            "max_wait_ms": round(stats.wait_max * 1000, 3),
+        })
+    return status
+
+
+async def get_session(response: Response) -> AsyncGenerator[AsyncSession, None]:
+    """Session on the primary, which takes a connection at its first query"""
     async with Session() as session:
-        yield session
\ No newline at end of file
+        if replica_engine is not engine:
+            @event.listens_for(session.sync_session, "after_commit", once=True)
+            def read_your_writes(sync_session):
+                until = int(time.time()) + settings.DB_READ_YOUR_WRITES_SECONDS
+                response.set_cookie(READ_PRIMARY_COOKIE, str(until), max_age=settings.DB_READ_YOUR_WRITES_SECONDS, httponly=True)
+
+        yield session
+
+
+def reads_primary(request: Request) -> bool:
+    """Whether the client wrote within the last DB_READ_YOUR_WRITES_SECONDS"""
+    read_primary_until = request.cookies.get(READ_PRIMARY_COOKIE, "")
+    return read_primary_until.isdigit() and int(read_primary_until) > time.time()
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Read-only session on the replica, or on the primary for a client that has just written"""
+    if replica_engine is engine or reads_primary(request):
+        async with Session() as session:
+            yield session
+    else:
+        async with ReadSession() as session:
+            yield session
@@ -2,9 +2,11 @@ from fastapi import Request, Depends
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
 from typing import List
-from .db.main import get_session
+import uuid
+from .config import settings
+from .db.main import get_session, Session
 from sqlmodel.ext.asyncio.session import AsyncSession
-from .utils import decode_token
+from .utils import verify_token
 from .service import UserService, TokenService
 from .errors import (AccessDenied, AccessTokenRequired, InvalidToken, RefreshTokenRequired, RevokedToken)
 
@@ -21,26 +23,17 @@ class TokenBearer(HTTPBearer):
         try:
             creds = await super().__call__(request)
 
-            token = creds.credentials
+            token_data = verify_token(creds.credentials)
 
-            token_data = decode_token(token)
-
-            if not self.token_valid(token):
+            if token_data is None:
                 raise InvalidToken()
 
-
             self.verify_token_data(token_data)
             
             return token_data
         except Exception as e:
             raise InvalidToken()
     
-    def token_valid(self, token:str) -> bool:
-
-        token_data = decode_token(token)
-
-        return True if token_data is not None else False
-    
     def verify_token_data(self, token_data):
         raise NotImplementedError("Please Override this method in child classes")
 
@@ -56,7 +49,24 @@ class RefreshTokenBearer(TokenBearer):
         if token_data and not token_data['refresh']:
             raise RefreshTokenRequired()
 
-async def get_current_user(token_details: dict = Depends(AccessTokenBearer()), session: AsyncSession = Depends(get_session)):
+# Shared instances, so FastAPI resolves the bearer once per request however many dependencies use it
+access_token_bearer = AccessTokenBearer()
+refresh_token_bearer = RefreshTokenBearer()
+
+class TokenUser:
+    """The user as described by the claims of a verified access token, without a database lookup"""
+
+    def __init__(self, claims: dict) -> None:
+        self.email = claims['email']
+        self.uid = uuid.UUID(claims['user_uid'])
+        self.role = claims.get('role')
+
+
+async def get_token_user(token_details: dict = Depends(access_token_bearer)) -> TokenUser:
+    return TokenUser(token_details['user'])
+
+
+async def get_current_user(token_details: dict = Depends(access_token_bearer), session: AsyncSession = Depends(get_session)):
     user_email = token_details['user']['email']
 
     user = await user_service.get_all_user_by_email(email=user_email, session=session)
@@ -69,16 +79,24 @@ class RoleChecker:
 
         self.allowed_roles = allowed_roles
 
-    def __call__(self, current_user = Depends(get_current_user)):
-        if current_user is not None and current_user.role in self.allowed_roles:
+    async def __call__(self, token_user: TokenUser = Depends(get_token_user)):
+        role = token_user.role
+
+        # Tokens issued before the role claim existed, and AUTH_STATELESS=false, still check the database
+        if role is None or not settings.AUTH_STATELESS:
+            async with Session() as session:
+                current_user = await user_service.get_all_user_by_email(email=token_user.email, session=session)
+            role = current_user.role if current_user is not None else None
+
+        if role in self.allowed_roles:
             return True
         raise AccessDenied()
 
 
-async def check_revoked_token(token_details: dict = Depends(AccessTokenBearer()), session: AsyncSession = Depends(get_session)):
+async def check_revoked_token(token_details: dict = Depends(access_token_bearer)):
 
     token_jti = token_details['jti']
-    is_blacklisted = await token_service.get_token_from_blacklist(session, token_jti)
+    is_blacklisted = await token_service.is_token_revoked(token_jti)
     if is_blacklisted:
         raise RevokedToken()
-    return True
\ No newline at end of file
+    return True
@@ -0,0 +1,99 @@
+import re
+from collections import deque
+
+
+WORD = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+class TermAnnotator:
+  """Aho-Corasick automaton over the dictionary headwords.
+
+  The automaton runs over words rather than characters: every headword is
+  split into upper-cased words and inserted into a trie of word transitions.
+  Matches therefore always fall on word boundaries, punctuation inside a
+  headword ("LAWNDE, LOWNDE") is ignored, and the trie has one node per
+  headword word instead of one per character.
+  """
+
+  def __init__(self, terms):
+    self.terms = list(terms)
+    self.goto = [{}]
+    self.depth = [0]
+    self.output = [-1]
+
+    for i, term in enumerate(self.terms):
+      node = 0
+      for word in WORD.findall(term.upper()):
+        child = self.goto[node].get(word)
+        if child is None:
+          child = len(self.goto)
+          self.goto[node][word] = child
+          self.goto.append({})
+          self.depth.append(self.depth[node] + 1)
+          self.output.append(-1)
+        node = child
+      if node and self.output[node] == -1:
+        self.output[node] = i
+
+    self.max_depth = max(self.depth)
+    self.fail = [0] * len(self.goto)
+    # Nearest proper suffix node that completes a headword, or -1
+    self.dict_link = [-1] * len(self.goto)
+
+    queue = deque(self.goto[0].values())
+    while queue:
+      node = queue.popleft()
+      for word, child in self.goto[node].items():
+        fallback = self.fail[node]
+        while fallback and word not in self.goto[fallback]:
+          fallback = self.fail[fallback]
+        target = self.goto[fallback].get(word, 0)
+        self.fail[child] = target if target != child else 0
+        self.dict_link[child] = target if self.output[target] != -1 else self.dict_link[target]
+        queue.append(child)
+
+  def scan(self, text: str):
+    """Yields (start, end, term id) for every headword occurrence in text, overlaps included."""
+    goto, fail, output, depth, dict_link = self.goto, self.fail, self.output, self.depth, self.dict_link
+    starts = deque(maxlen=self.max_depth)
+    node = 0
+
+    for match in WORD.finditer(text):
+      word = match.group().upper()
+      starts.append(match.start())
+
+      while node and word not in goto[node]:
+        node = fail[node]
+      node = goto[node].get(word, 0)
+
+      hit = node if output[node] != -1 else dict_link[node]
+      while hit != -1:
+        yield starts[-depth[hit]], match.end(), output[hit]
+        hit = dict_link[hit]
+
+  def matches(self, text: str):
+    """Yields the leftmost-longest, non-overlapping (start, end, term id) occurrences in text."""
+    last_end = 0
+    for start, end, i in sorted(self.scan(text), key=lambda hit: (hit[0], -hit[1])):
+      if start >= last_end:
+        yield start, end, i
+        last_end = end
+
+  def annotate(self, text: str):
+    """Returns the leftmost-longest, non-overlapping headword occurrences in text."""
+    return [{'term': self.terms[i], 'start': start, 'end': end} for start, end, i in self.matches(text)]
+
+  def annotate_json(self, value, path: str = ''):
+    """Annotates every string inside a json document, tagging each hit with its JSON Pointer path."""
+    annotations = []
+    if isinstance(value, str):
+      for annotation in self.annotate(value):
+        annotations.append({'path': path, **annotation})
+    elif isinstance(value, dict):
+      for key, item in value.items():
+        key = str(key).replace('~', '~0').replace('/', '~1')
+        annotations.extend(self.annotate_json(item, f"{path}/{key}"))
+    elif isinstance(value, list):
+      for index, item in enumerate(value):
+        annotations.extend(self.annotate_json(item, f"{path}/{index}"))
+    return annotations
@@ -0,0 +1,97 @@
+import math
+import re
+from array import array
+from collections import Counter
+from heapq import nlargest
+from html import escape
+
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each either etc few for from further had has
+have having he her here hers him his how i id if in into is it its itself may me more most must my neither
+no nor not of off on once only or other our ours out over own same see shall she should so some such than
+that the their theirs them then there these they this those through thus to too under until up upon us very
+was we were what when where which while who whom why will with would you your
+""".split())
+
+
+def tokenize(text: str):
+  """Lower-cases text and splits it into words, dropping stop words."""
+  return [token for token in TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class DefinitionIndex:
+  """Inverted index over the dictionary definitions, ranked with BM25.
+
+  Postings are kept as parallel arrays of entry ids and term frequencies so
+  the index over ~2 MB of definitions stays a few MB in memory.
+  """
+
+  def __init__(self, store, k1: float = 1.2, b: float = 0.75):
+    self.store = store
+    self.k1 = k1
+    self.b = b
+    self.lengths = array('I')
+    self.postings = {}
+
+    for i in range(len(store)):
+      tokens = tokenize(store.definition(i))
+      self.lengths.append(len(tokens))
+      for token, count in Counter(tokens).items():
+        posting = self.postings.get(token)
+        if posting is None:
+          posting = self.postings[token] = (array('I'), array('I'))
+        posting[0].append(i)
+        posting[1].append(count)
+
+    self.average_length = sum(self.lengths) / max(len(self.lengths), 1)
+
+  def score(self, q: str):
+    """Returns the BM25 score of every entry matching any word of q."""
+    scores = {}
+    total = len(self.lengths)
+    lengths = self.lengths
+    k1, b = self.k1, self.b
+    norm = k1 * (1 - b)
+    slope = k1 * b / self.average_length
+
+    for token in set(tokenize(q)):
+      posting = self.postings.get(token)
+      if posting is None:
+        continue
+      docs, counts = posting
+      idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+      for i, count in zip(docs, counts):
+        scores[i] = scores.get(i, 0.0) + idf * count * (k1 + 1) / (count + norm + slope * lengths[i])
+    return scores
+
+  def search(self, q: str, limit: int = 10, offset: int = 0):
+    """Returns the total number of matches and one page of (id, score) pairs."""
+    scores = self.score(q)
+    ranked = nlargest(offset + limit, scores, key=scores.__getitem__)
+    return len(scores), [(i, scores[i]) for i in ranked[offset:]]
+
+
+def highlight(text: str, q: str, width: int = 160, tag: str = 'mark'):
+  """Returns an html-escaped window of text around the first query word, with matches wrapped in tag."""
+  words = set(tokenize(q))
+  if not words:
+    return escape(text[:width])
+
+  pattern = re.compile(r"\b(%s)\b" % '|'.join(map(re.escape, sorted(words))), re.IGNORECASE)
+  first = pattern.search(text)
+  start = max(0, first.start() - width // 3) if first else 0
+  end = min(len(text), start + width)
+
+  snippet = []
+  position = start
+  for match in pattern.finditer(text, start, end):
+    snippet.append(escape(text[position:match.start()]))
+    snippet.append(f"<{tag}>{escape(match.group())}</{tag}>")
+    position = match.end()
+  snippet.append(escape(text[position:end]))
+
+  return ('...' if start > 0 else '') + ''.join(snippet) + ('...' if end < len(text) else '')
@@ -0,0 +1,129 @@
+from array import array
+from heapq import heappush, heappushpop
+
+
+def levenshtein(a: str, b: str) -> int:
+  """Returns the edit distance between a and b."""
+  if len(a) < len(b):
+    a, b = b, a
+
+  previous = list(range(len(b) + 1))
+  for i, ca in enumerate(a, 1):
+    current = [i]
+    for j, cb in enumerate(b, 1):
+      current.append(min(
+        previous[j] + 1,
+        current[j - 1] + 1,
+        previous[j - 1] + (ca != cb),
+      ))
+    previous = current
+  return previous[-1]
+
+
+def _pattern(q: str):
+  """Bitmasks of the positions of each character in q, for edit_distance."""
+  peq = {}
+  for j, c in enumerate(q):
+    peq[c] = peq.get(c, 0) | 1 << j
+  return peq
+
+
+def edit_distance(peq: dict, length: int, text: str) -> int:
+  """Returns the edit distance between the pattern behind peq, of the given length, and text.
+
+  The same distance as levenshtein, computed a whole column at a time with
+  Myers' bit-parallel algorithm, which makes rescoring many candidates cheap.
+  """
+  full = (1 << length) - 1
+  last = 1 << (length - 1)
+  pv, mv, distance = full, 0, length
+  for c in text:
+    eq = peq.get(c, 0)
+    xv = eq | mv
+    xh = (((eq & pv) + pv) ^ pv) | eq
+    ph = (mv | ~(xh | pv)) & full
+    mh = pv & xh
+    if ph & last:
+      distance += 1
+    elif mh & last:
+      distance -= 1
+    ph = (ph << 1 | 1) & full
+    mh = (mh << 1) & full
+    pv = (mh | ~(xv | ph)) & full
+    mv = ph & xv
+  return distance
+
+
+def _grams(term: str):
+  padded = f"  {term} "
+  return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+  """Typo-tolerant lookup over the dictionary headwords.
+
+  Candidates are gathered from a padded trigram index. The trigrams they
+  share with the query bound their edit distance from below, so they are
+  rescored with the exact distance in order of that bound, stopping once
+  no remaining candidate can beat the current results.
+  """
+
+  def __init__(self, terms):
+    self.terms = list(terms)
+    self.sizes = array('H')
+    self.lengths = array('H')
+    self.grams = {}
+
+    for i, term in enumerate(self.terms):
+      grams = _grams(term)
+      self.sizes.append(len(grams))
+      self.lengths.append(len(term))
+      for gram in grams:
+        posting = self.grams.get(gram)
+        if posting is None:
+          posting = self.grams[gram] = array('I')
+        posting.append(i)
+
+  def search(self, q: str, limit: int = 5):
+    """Returns the limit closest terms to q as (term, score) pairs.
+
+    The score is 1 - distance / length of the longer string, so an exact
+    match scores 1.0. Among the terms sharing a trigram with q, the result
+    is the same as scoring every one of them.
+    """
+    q = ' '.join(q.split())
+    if not q:
+      return []
+
+    grams = _grams(q)
+    shared = {}
+    for gram in grams:
+      for i in self.grams.get(gram, ()):
+        shared[i] = shared.get(i, 0) + 1
+
+    sizes = self.sizes
+    lengths = self.lengths
+    size = len(grams)
+    length = len(q)
+
+    # An edit touches at most three padded trigrams and changes the length by at most one
+    bounds = []
+    for i, common in shared.items():
+      distance = max(-(-(max(size, sizes[i]) - common) // 3), abs(length - lengths[i]))
+      bounds.append((1 - distance / max(length, lengths[i]), -i))
+    bounds.sort(reverse=True)
+
+    # Min-heap of (score, -i), so ties go to the earlier headword
+    peq = _pattern(q)
+    top = []
+    for bound, i in bounds:
+      if len(top) == limit and (bound, i) < top[0]:
+        break
+      term = self.terms[-i]
+      scored = (1 - edit_distance(peq, length, term) / max(length, len(term)), i)
+      if len(top) < limit:
+        heappush(top, scored)
+      else:
+        heappushpop(top, scored)
+
+    return [(self.terms[-i], round(score, 3)) for score, i in sorted(top, reverse=True)]
@@ -0,0 +1,70 @@
+import math
+from array import array
+from collections import Counter
+
+
+def _csr(rows):
+  """Packs a list of id lists into (offsets, targets) arrays."""
+  offsets, targets = array('I', [0]), array('I')
+  for row in rows:
+    targets.extend(row)
+    offsets.append(len(targets))
+  return offsets, targets
+
+
+class TermGraph:
+  """Cross-references between dictionary entries, stored as CSR arrays.
+
+  An entry references every other headword its definition mentions. Since
+  common headwords ("ACTION", "COURT") are mentioned everywhere, neighbours
+  are ranked by how rarely they are referenced and capped at max_related.
+  Two-hop neighbours are precomputed with the same cap, so every lookup is a
+  pair of array slices.
+  """
+
+  def __init__(self, store, annotator, max_related: int = 20):
+    count = len(store)
+    mentions = []
+    for i in range(count):
+      found = {j for _, _, j in annotator.matches(store.definition(i))}
+      found.discard(i)
+      mentions.append(found)
+
+    referenced = Counter(j for found in mentions for j in found)
+    weight = [math.log((count + 1) / (referenced[j] + 1)) for j in range(count)]
+
+    references = [sorted(found, key=lambda j: (-weight[j], j))[:max_related] for found in mentions]
+
+    backlinks = [[] for _ in range(count)]
+    for i, found in enumerate(mentions):
+      for j in found:
+        backlinks[j].append(i)
+    referenced_by = [sorted(row, key=lambda j: (-weight[j], j))[:max_related] for row in backlinks]
+
+    two_hop = []
+    for i, direct in enumerate(references):
+      scores = Counter()
+      for j in direct:
+        for k in references[j]:
+          scores[k] += weight[j] + weight[k]
+      scores.pop(i, None)
+      for j in direct:
+        scores.pop(j, None)
+      two_hop.append([k for k, _ in scores.most_common(max_related)])
+
+    self.references = _csr(references)
+    self.referenced_by = _csr(referenced_by)
+    self.two_hop = _csr(two_hop)
+
+  @staticmethod
+  def _row(csr, i: int):
+    offsets, targets = csr
+    return targets[offsets[i]:offsets[i + 1]]
+
+  def related(self, i: int):
+    """Returns the (references, referenced by, two-hop) entry ids of entry i."""
+    return (
+      self._row(self.references, i),
+      self._row(self.referenced_by, i),
+      self._row(self.two_hop, i),
+    )
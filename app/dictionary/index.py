@@ -0,0 +1,79 @@
+from array import array
+from bisect import bisect_left
+from itertools import chain, islice
+
+
+# Highest code point, used as the upper bound of a prefix range in the sorted term list
+_MAX_CHAR = '\U0010ffff'
+
+# Longest n-gram indexed; shorter queries use the postings of their own length
+_GRAM = 3
+
+
+class TermIndex:
+  """Prebuilt prefix and infix index over the dictionary headwords.
+
+  Terms are kept in a sorted list so every prefix match is one contiguous
+  slice found with two binary searches. Infix matches are answered from an
+  n-gram index: only the terms sharing the rarest trigram of the query are
+  verified, instead of every key in the dictionary. Queries of one or two
+  characters, the first keystrokes of an autocomplete, use the postings of
+  their single characters or bigram the same way.
+  """
+
+  def __init__(self, terms):
+    self.terms = sorted(set(terms))
+    self.grams = {}
+
+    for i, term in enumerate(self.terms):
+      for gram in {term[j:j + n] for n in range(1, _GRAM + 1) for j in range(len(term) - n + 1)}:
+        posting = self.grams.get(gram)
+        if posting is None:
+          posting = self.grams[gram] = array('I')
+        posting.append(i)
+
+  def __len__(self):
+    return len(self.terms)
+
+  def prefix_range(self, q: str):
+    """Returns the [lo, hi) slice of sorted terms starting with q."""
+    lo = bisect_left(self.terms, q)
+    hi = bisect_left(self.terms, q + _MAX_CHAR, lo)
+    return lo, hi
+
+  def _infix_candidates(self, q: str):
+    n = min(len(q), _GRAM)
+    postings = None
+    for j in range(len(q) - n + 1):
+      posting = self.grams.get(q[j:j + n])
+      if posting is None:
+        return ()
+      if postings is None or len(posting) < len(postings):
+        postings = posting
+    return postings
+
+  def _infix(self, q: str):
+    terms = self.terms
+    for i in self._infix_candidates(q):
+      term = terms[i]
+      if q in term and not term.startswith(q):
+        yield term
+
+  def search(self, q: str, limit: int = 10, offset: int = 0):
+    """Returns terms containing q ranked exact match, then prefix, then infix.
+
+    Results are produced lazily, so only offset + limit matches are ever
+    looked at no matter how many terms contain the query.
+    """
+    if not q:
+      return []
+
+    lo, hi = self.prefix_range(q)
+    if lo < hi and self.terms[lo] == q:
+      exact, lo = [q], lo + 1
+    else:
+      exact = []
+
+    prefixed = map(self.terms.__getitem__, range(lo, hi))
+    matches = chain(exact, prefixed, self._infix(q))
+    return list(islice(matches, offset, offset + limit))
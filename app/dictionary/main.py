@@ -1,29 +1,90 @@
-import json
 from fastapi import HTTPException
 from ..schemas import TermDefinition
-from random import choice
-import os
+from .index import TermIndex
+from .fuzzy import FuzzyIndex
+from .fulltext import DefinitionIndex, highlight
+from .annotator import TermAnnotator
+from .graph import TermGraph
+from .store import open_dictionary
+from random import randrange
+from datetime import date
+import hashlib
+from typing import List
+from functools import cache
+import asyncio
+import gc
 
 
-# Load terms and definitions from JSON file
-def load_dictionary(filename):
-  """Loads the Black's Law Dictionary from a JSON file."""
-  file_path = os.path.join(os.path.dirname(__file__), filename)
+# Terms and definitions are memory-mapped from the compiled data.bin
+law_dict = open_dictionary()
 
+term_index = TermIndex(law_dict.keys())
+fuzzy_index = FuzzyIndex(law_dict.keys())
+term_annotator = TermAnnotator(law_dict.keys())
+
+
+@cache
+def get_definition_index():
+  """The definition full-text index, built once by build_indexes."""
+  return DefinitionIndex(law_dict)
+
+
+@cache
+def get_term_graph():
+  """The cross-reference graph between definitions, built once by build_indexes."""
+  return TermGraph(law_dict, term_annotator)
+
+
+def build_indexes():
+  """Builds the definition index and the term graph, which take about a second, before any request needs them.
+
+  Importing the module stays cheap for scripts and migrations; the app
+  builds the same indexes off the event loop with start_index_builds.
+  """
+  get_definition_index()
+  get_term_graph()
+
+
+_builds = {}
+
+
+def build_in_background(build):
+  """Starts one of the lazy index builds in a worker thread, once, and returns its future."""
+  if build not in _builds:
+    _builds[build] = asyncio.ensure_future(asyncio.to_thread(build))
+  return _builds[build]
+
+
+async def wait_for_index(build):
+  """Waits for a background index build, starting it if startup has not.
+
+  A failed build is forgotten so the next request retries it.
+  """
+  future = build_in_background(build)
   try:
-    with open(file_path) as f:
-      return json.load(f)
-  except FileNotFoundError:
-    print(f"Error: Could not find the dictionary file '{filename}'.")
-    return {} 
+    await asyncio.shield(future)
+  except Exception:
+    _builds.pop(build, None)
+    raise
 
-dict = load_dictionary('data.json')
 
-law_dict = {}
+def start_index_builds():
+  """Starts building the lazy indexes in the background; called from the app lifespan."""
+  build_in_background(get_definition_index)
+  build_in_background(get_term_graph)
 
-for id in dict['term']:
-  law_dict[dict['term'][id]] = dict['definition'][id]
 
+def preload_dictionary():
+  """Builds every lazy index and freezes the heap, ready to be shared by forked workers.
+
+  Call it in the parent process before forking (see gunicorn.conf.py). The
+  definitions are already a shared memory map; gc.freeze() keeps the
+  collector from writing to the indexes' pages, so they stay copy-on-write
+  shared instead of being duplicated into every worker.
+  """
+  build_indexes()
+  gc.collect()
+  gc.freeze()
 
 
 
@@ -31,29 +92,97 @@ class DictionaryService:
   def get_term_definition(self, q: str):
     """Returns the definition of a given legal term."""
     q = q.upper()
-    if law_dict[q]:
-      return law_dict[q]
+    definition = law_dict.get(q)
+    if definition:
+      return definition
     else:
-      raise HTTPException(status_code=404, detail='Definition Not Found')
+      raise HTTPException(status_code=404, detail={
+        'message': 'Definition Not Found',
+        'suggestions': [term for term, _ in fuzzy_index.search(q)]
+      })
   
-  def get_terms(self, q: str):
-    """Finds terms in the dictionary that contain the search string."""
-    q = q.upper()
+  def get_term_definitions(self, terms: List[str]):
+    """Looks up many terms at once, marking the ones not in the dictionary."""
     results = []
-    count = 0
+    for term in terms:
+      definition = law_dict.get(term.strip().upper())
+      results.append({
+        'term': term,
+        'definition': definition,
+        'found': definition is not None
+      })
+    return results
 
-    for k in law_dict.keys():
-      if q in k:
-        results.append(k)
-        count += 1
+  def get_terms(self, q: str, limit: int = 10, offset: int = 0):
+    """Finds terms in the dictionary that contain the search string.
 
-        if count >= 10:
-            break 
-    return results
+    Exact matches rank first, then terms starting with the search string,
+    then terms containing it anywhere else.
+    """
+    q = q.strip().upper()
+    return term_index.search(q, limit=limit, offset=offset)
   
-  def get_random_word(self):
-    q = choice(list(law_dict.keys()))
+  def get_fuzzy_terms(self, q: str, limit: int = 5):
+    """Finds the terms closest to a possibly misspelled search string."""
+    q = q.upper()
+    return [{'term': term, 'score': score} for term, score in fuzzy_index.search(q, limit=limit)]
+
+  def search_definitions(self, q: str, limit: int = 10, offset: int = 0):
+    """Finds the entries whose definitions best match the search words."""
+    total, hits = get_definition_index().search(q, limit=limit, offset=offset)
+    results = []
+    for i, score in hits:
+      results.append({
+        'term': law_dict.terms[i],
+        'score': round(score, 3),
+        'snippet': highlight(law_dict.definition(i), q)
+      })
+    return {'total': total, 'results': results}
+
+  def annotate_text(self, text: str):
+    """Finds every legal term mentioned in a piece of text, with its offsets."""
+    return term_annotator.annotate(text)
+
+  def get_related_terms(self, q: str):
+    """Returns the terms a definition refers to, the ones referring to it, and their neighbours."""
+    q = q.upper()
+    i = law_dict.position(q)
+    if i is None:
+      raise HTTPException(status_code=404, detail='Definition Not Found')
+
+    references, referenced_by, two_hop = get_term_graph().related(i)
     return {
       'term': q,
-      'definition': law_dict[q]
-    }
\ No newline at end of file
+      'references': [law_dict.terms[j] for j in references],
+      'referenced_by': [law_dict.terms[j] for j in referenced_by],
+      'two_hop': [law_dict.terms[j] for j in two_hop]
+    }
+
+  def get_letter_terms(self, letter: str, cursor: str = None, limit: int = 50):
+    """Lists the terms under a letter in alphabetical order, one page at a time."""
+    letter = letter.upper()
+    if letter not in law_dict.letters:
+      raise HTTPException(status_code=404, detail='Letter Not Found')
+
+    lo, hi = law_dict.letter_page(letter, cursor=cursor.upper() if cursor else None, limit=limit)
+    terms = law_dict.terms[lo:hi]
+    return {
+      'letter': letter,
+      'total': law_dict.letters[letter][1] - law_dict.letters[letter][0],
+      'terms': terms,
+      'next_cursor': terms[-1] if terms and hi < law_dict.letters[letter][1] else None
+    }
+
+  def get_word(self, i: int):
+    return {
+      'term': law_dict.terms[i],
+      'definition': law_dict.definition(i)
+    }
+
+  def get_random_word(self):
+    return self.get_word(randrange(len(law_dict)))
+
+  def get_daily_word(self, day: date):
+    """Returns the word of the day, the same in every worker for a given date."""
+    seed = hashlib.sha256(day.isoformat().encode()).digest()
+    return self.get_word(int.from_bytes(seed[:8], 'big') % len(law_dict))
@@ -0,0 +1,220 @@
+"""Compact, offset-indexed binary format for the legal dictionary.
+
+`data.json` is compiled once into `data.bin`:
+
+  header          magic, sha256 of the source json, entry count, match type count
+  term offsets    uint32 * (count + 1), relative to the term blob
+  def offsets     uint32 * (count + 1), relative to the definition blob
+  match types     uint8 * count, padded to 4 bytes
+  type names      uint32 length + utf-8 names separated by newlines
+  term blob       utf-8 terms, sorted
+  def blob        utf-8 definitions, in term order
+
+Run `python -m app.dictionary.store` after editing `data.json` to rebuild it.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
+
+MAGIC = b'LPDICT2\x00'
+HEADER = struct.Struct('<8s32sII')
+
+DATA_DIR = os.path.dirname(__file__)
+SOURCE_PATH = os.path.join(DATA_DIR, 'data.json')
+BINARY_PATH = os.path.join(DATA_DIR, 'data.bin')
+
+
+def _uint32(values) -> bytes:
+  table = array('I', values)
+  if sys.byteorder != 'little':
+    table.byteswap()
+  return table.tobytes()
+
+
+def compile_dictionary(source: str = SOURCE_PATH) -> bytes:
+  """Compiles the columnar json dictionary into the binary format."""
+  with open(source, 'rb') as f:
+    raw = f.read()
+  data = json.loads(raw)
+
+  # Later duplicates overwrite earlier ones, as the json loader always did
+  entries = {}
+  for id in data['term']:
+    entries[data['term'][id]] = (data['definition'][id], data['match_type'][id])
+
+  terms = sorted(entries)
+  match_types = sorted({match_type for _, match_type in entries.values()})
+  type_codes = {name: code for code, name in enumerate(match_types)}
+
+  term_offsets, def_offsets = [0], [0]
+  term_blob, def_blob = bytearray(), bytearray()
+  codes = bytearray()
+
+  for term in terms:
+    definition, match_type = entries[term]
+    term_blob += term.encode()
+    def_blob += definition.encode()
+    term_offsets.append(len(term_blob))
+    def_offsets.append(len(def_blob))
+    codes.append(type_codes[match_type])
+
+  codes += bytes(-len(codes) % 4)
+  names = '\n'.join(match_types).encode()
+
+  return b''.join([
+    HEADER.pack(MAGIC, hashlib.sha256(raw).digest(), len(terms), len(match_types)),
+    _uint32(term_offsets),
+    _uint32(def_offsets),
+    bytes(codes),
+    _uint32([len(names)]),
+    names,
+    bytes(term_blob),
+    bytes(def_blob),
+  ])
+
+
+def write_dictionary(source: str = SOURCE_PATH, dest: str = BINARY_PATH) -> bytes:
+  """Compiles source into dest, replacing it atomically."""
+  data = compile_dictionary(source)
+  tmp = f"{dest}.{os.getpid()}.tmp"
+  with open(tmp, 'wb') as f:
+    f.write(data)
+  os.replace(tmp, dest)
+  return data
+
+
+class DictionaryStore(Mapping):
+  """Read-only term -> definition mapping over a compiled dictionary.
+
+  The buffer is usually a memory map of `data.bin`, so opening the store
+  costs one page-in of the offset tables and the term blob. Definitions
+  stay as bytes in the page cache, shared by every process mapping the same
+  file, and are only decoded when looked up.
+  """
+
+  def __init__(self, buffer):
+    self.buffer = buffer
+    view = memoryview(buffer)
+
+    magic, self.source_hash, count, type_count = HEADER.unpack_from(view)
+    if magic != MAGIC:
+      raise ValueError('Not a compiled dictionary file')
+
+    pos = HEADER.size
+    self.term_offsets = self._table(view, pos, count + 1)
+    pos += 4 * (count + 1)
+    self.def_offsets = self._table(view, pos, count + 1)
+    pos += 4 * (count + 1)
+    self.match_type_codes = view[pos:pos + count]
+    pos += count + (-count % 4)
+
+    names_size, = struct.unpack_from('<I', view, pos)
+    pos += 4
+    self.match_types = bytes(view[pos:pos + names_size]).decode().split('\n')[:type_count]
+    pos += names_size
+
+    self.term_start = pos
+    self.def_start = pos + self.term_offsets[count]
+
+    term_blob = bytes(view[self.term_start:self.def_start]).decode()
+    # Terms are ascii, so byte offsets double as character offsets
+    if len(term_blob) == self.term_offsets[count]:
+      self.terms = [term_blob[self.term_offsets[i]:self.term_offsets[i + 1]] for i in range(count)]
+    else:
+      self.terms = [self._decode(self.term_start, self.term_offsets, i) for i in range(count)]
+
+    # Terms are sorted, so each initial letter owns one contiguous [lo, hi) range of ids
+    self.letters = {}
+    lo = 0
+    while lo < count:
+      letter = self.terms[lo][0]
+      hi = bisect_left(self.terms, chr(ord(letter) + 1), lo)
+      self.letters[letter] = (lo, hi)
+      lo = hi
+
+  @staticmethod
+  def _table(view, pos, length):
+    table = view[pos:pos + 4 * length]
+    if sys.byteorder == 'little':
+      return table.cast('I')
+    table = array('I', table)
+    table.byteswap()
+    return table
+
+  def _decode(self, start, offsets, i):
+    return self.buffer[start + offsets[i]:start + offsets[i + 1]].decode()
+
+  @classmethod
+  def open(cls, path: str = BINARY_PATH) -> 'DictionaryStore':
+    with open(path, 'rb') as f:
+      return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+  def position(self, term: str):
+    """Returns the id of term, or None when it is not in the dictionary."""
+    i = bisect_left(self.terms, term)
+    if i < len(self.terms) and self.terms[i] == term:
+      return i
+    return None
+
+  def letter_page(self, letter: str, cursor: str = None, limit: int = 50):
+    """Returns the [lo, hi) ids of up to limit terms under letter that sort after cursor."""
+    lo, hi = self.letters.get(letter, (0, 0))
+    if cursor is not None:
+      lo = bisect_right(self.terms, cursor, lo, hi)
+    return lo, min(hi, lo + limit)
+
+  def definition(self, i: int) -> str:
+    return self._decode(self.def_start, self.def_offsets, i)
+
+  def match_type(self, i: int) -> str:
+    return self.match_types[self.match_type_codes[i]]
+
+  def __getitem__(self, term: str) -> str:
+    i = self.position(term)
+    if i is None:
+      raise KeyError(term)
+    return self.definition(i)
+
+  def __contains__(self, term) -> bool:
+    return self.position(term) is not None
+
+  def __iter__(self):
+    return iter(self.terms)
+
+  def __len__(self):
+    return len(self.terms)
+
+
+def open_dictionary(binary: str = BINARY_PATH, source: str = SOURCE_PATH) -> DictionaryStore:
+  """Opens the compiled dictionary, recompiling it if data.json has changed."""
+  try:
+    with open(source, 'rb') as f:
+      source_hash = hashlib.sha256(f.read()).digest()
+  except FileNotFoundError:
+    source_hash = None
+
+  try:
+    store = DictionaryStore.open(binary)
+    if source_hash is None or store.source_hash == source_hash:
+      return store
+  except (FileNotFoundError, ValueError, struct.error):
+    pass
+
+  try:
+    write_dictionary(source, binary)
+  except OSError:
+    # Read-only deployments still work, just without the shared mapping
+    return DictionaryStore(compile_dictionary(source))
+  return DictionaryStore.open(binary)
+
+
+if __name__ == '__main__':
+  write_dictionary()
+  print(f"Compiled {SOURCE_PATH} into {BINARY_PATH}")
@@ -71,6 +71,14 @@ class AdminNotFound(LegalPadiException):
     """Admin Not Found"""
     pass
 
+class InvalidCursor(LegalPadiException):
+    """User has provided a pagination cursor that was not issued by the API"""
+    pass
+
+class InvalidTagFilter(LegalPadiException):
+    """User has provided a tag filter that is not a short list of tag ids"""
+    pass
+
 
 def create_exception_handler(status_code:int, initial_detail: Any) -> Callable[[Request, Exception], JSONResponse]:
     async def exception_handler(request: Request, exc: LegalPadiException):
@@ -242,3 +250,23 @@ def register_all_errors (app: FastAPI):
             }
         )
     )
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Pagination cursor is invalid",
+                "error": "Request Error"
+            }
+        )
+    )
+    app.add_exception_handler(
+        InvalidTagFilter,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Tags must be a comma separated list of tag ids",
+                "error": "Request Error"
+            }
+        )
+    )
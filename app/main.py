@@ -1,6 +1,9 @@
 from fastapi import FastAPI, APIRouter
 from contextlib import asynccontextmanager
-from .db.main import init_db
+import asyncio
+from .db.main import init_db, engine
+from .dictionary.main import start_index_builds
+from .service import TokenService, LikeService
 from .routers import (admin, user, course, editor, course_tag, tag, dictionary, like)
 from .errors import register_all_errors
 from .middleware import register_middleware
@@ -10,7 +13,13 @@ from .middleware import register_middleware
 async def life_span(app:FastAPI):
     print(f"Server is starting...")
     await init_db()
+    start_index_builds()
+    purge_task = asyncio.create_task(TokenService().purge_expired_tokens_periodically())
+    reconcile_task = asyncio.create_task(LikeService().reconcile_likes_count_periodically())
     yield
+    purge_task.cancel()
+    reconcile_task.cancel()
+    await engine.dispose()
     print(f"Server has been stopped")
 
 version = "v1"
@@ -1,6 +1,7 @@
-from sqlmodel import SQLModel, Field, Column, String, Relationship, Text
+from sqlmodel import SQLModel, Field, Column, String, Relationship, Text, JSON, Index
 from datetime import datetime, timezone
 import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import BigInteger, func
 import uuid
 from typing import Optional, List
 from enum import Enum
@@ -18,14 +19,21 @@ class CourseType(Enum):
     VIDEO = "video"
     ARTICLE = "article"
 
+class TagMatch(Enum):
+    ALL = "all"
+    ANY = "any"
+
 # USERS
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_role_created_at", "role", "created_at"),
+    )
 
     uid: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     first_name: str = Field(nullable=False)
     last_name: str = Field(nullable=False)
-    email: str = Field(nullable=False)
+    email: str = Field(nullable=False, unique=True, index=True)
     password: str = Field(nullable=False) 
     temporary_password: str = Field(nullable=True)
     phone_number: str = Field(nullable=True)
@@ -33,7 +41,7 @@ class User(SQLModel, table=True):
     is_verified: bool = Field(default=False)
     is_premium: bool = Field(default=False)
     created_at: datetime = Field(sa_column= Column(pg.TIMESTAMP, default=datetime.now, nullable=False))
-    updated_at: datetime = Field(sa_column= Column(pg.TIMESTAMP, default=datetime.now))
+    updated_at: datetime = Field(sa_column= Column(pg.TIMESTAMP, default=datetime.now, onupdate=datetime.now))
     
     courses: List['Course'] = Relationship(back_populates="user", sa_relationship_kwargs={"lazy":"selectin"}, cascade_delete=True)
     likes: List['Like'] = Relationship(back_populates="user", sa_relationship_kwargs={"lazy":"selectin"})
@@ -48,6 +56,7 @@ class Tag(SQLModel, table=True):
 
     id: int = Field(default=None, primary_key=True) 
     name: str = Column(unique=True, nullable=False)
+    updated_at: datetime = Field(sa_column= Column(pg.TIMESTAMP, default=datetime.now, onupdate=datetime.now, server_default=func.now(), nullable=False))
 
     courses: List['Course'] = Relationship(back_populates="tags", sa_relationship_kwargs={"lazy":"selectin", "secondary": "course_tags"}) 
 
@@ -58,14 +67,18 @@ class Tag(SQLModel, table=True):
 #VIDEO COURSE
 class Course(SQLModel, table=True):
     __tablename__ = "courses"
+    __table_args__ = (
+        Index("ix_courses_created_at_uid", "created_at", "uid"),
+        Index("ix_courses_user_uid_created_at", "user_uid", "created_at"),
+    )
 
     uid: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     title: str = Field(nullable=False) 
     thumbnail: str = Field(nullable=True) 
     description: str = Field(nullable=True)
-    likes_count: int = Field(nullable=True)
+    likes_count: int = Field(default=0, nullable=True)
     type: CourseType = Field(sa_column=Column(String, default=CourseType.VIDEO.value))
-    courses: Optional[dict] = Field(sa_column=Column("courses", pg.JSONB(astext_type=Text())))
+    courses: Optional[dict] = Field(sa_column=Column("courses", JSON().with_variant(pg.JSONB(astext_type=Text()), "postgresql")))
     created_at: datetime = Field(sa_column= Column(pg.TIMESTAMP, default=datetime.now, nullable=False))
     updated_at: datetime = Field(sa_column= Column(pg.TIMESTAMP, default=datetime.now, onupdate=datetime.now)) 
     user_uid: uuid.UUID = Field(foreign_key="users.uid")
@@ -79,6 +92,9 @@ class Course(SQLModel, table=True):
 
 class CourseTag(SQLModel, table=True):
     __tablename__ = "course_tags"
+    __table_args__ = (
+        Index("ix_course_tags_tag_id_course_uid", "tag_id", "course_uid"),
+    )
 
     course_uid: uuid.UUID = Field(primary_key=True, foreign_key='courses.uid')
     tag_id: int = Field(foreign_key="tags.id", primary_key=True)
@@ -91,7 +107,7 @@ class Like (SQLModel, table=True):
     __tablename__ = 'likes'
 
     user_uid: uuid.UUID = Field(primary_key=True, foreign_key='users.uid')
-    course_uid: uuid.UUID = Field(primary_key=True, foreign_key='courses.uid')
+    course_uid: uuid.UUID = Field(primary_key=True, foreign_key='courses.uid', index=True)
 
     user: Optional['User'] = Relationship(back_populates="likes", sa_relationship_kwargs={"lazy":"selectin"})
     courses: Optional['Course'] = Relationship(back_populates="likes", sa_relationship_kwargs={"lazy":"selectin"})
@@ -110,7 +126,9 @@ class RevokedToken(SQLModel, table=True):
             default=uuid.uuid4
         )
     )
-    token_jti : str = Field(sa_column= Column(String(300), primary_key=True))
+    token_jti : str = Field(sa_column= Column(String(300), primary_key=True, unique=True, index=True))
+    revoked_at: datetime = Field(sa_column= Column(pg.TIMESTAMP, server_default=func.now(), nullable=False, index=True))
+    expires_at: int = Field(sa_column= Column(BigInteger, nullable=False, index=True))
 
     def __repr__(self):
         return f"<Token {self.token_jti}>"
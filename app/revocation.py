@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import math
+import time
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing of one blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        """Sets the key's bits; count only grows for keys the filter did not already report, so re-adding is free"""
+        new = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        self.count += new
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationCache:
+    """Process-local front for the revokedtoken table.
+
+    Every revoked jti that has not expired yet is in the Bloom filter, so a
+    miss proves the token was not revoked and needs no query; a possible hit
+    is confirmed against the database. Each worker pulls the rows revoked by
+    other workers at most sync_interval seconds apart, and rebuilds the
+    filter from scratch after expired rows are purged.
+    """
+
+    def __init__(self, capacity: int, sync_interval: float) -> None:
+        self.capacity = capacity
+        self.sync_interval = sync_interval
+        self.bloom = None
+        # Newest revoked_at seen so far; syncs fetch rows from a little before it
+        self.watermark = None
+        self.synced_at = 0.0
+        self.lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.bloom is not None
+
+    def due(self) -> bool:
+        return not self.loaded or time.monotonic() - self.synced_at >= self.sync_interval
+
+    def needs_reset(self) -> bool:
+        """True before the first load, and once the filter holds more than it was sized for."""
+        return not self.loaded or self.bloom.count > self.bloom.capacity
+
+    def reset(self, rows) -> None:
+        """Replaces the filter with the given (jti, revoked_at) rows."""
+        rows = list(rows)
+        self.bloom = BloomFilter(max(self.capacity, 2 * len(rows)))
+        self.watermark = None
+        self.update(rows)
+
+    def update(self, rows) -> None:
+        for token_jti, revoked_at in rows:
+            self.bloom.add(token_jti)
+            if revoked_at is not None and (self.watermark is None or revoked_at > self.watermark):
+                self.watermark = revoked_at
+        self.synced_at = time.monotonic()
+
+    def clear(self) -> None:
+        self.bloom = None
+        self.watermark = None
+
+    def add(self, token_jti: str) -> None:
+        if self.loaded:
+            self.bloom.add(token_jti)
+
+    def might_contain(self, token_jti: str) -> bool:
+        return not self.loaded or token_jti in self.bloom
@@ -1,12 +1,12 @@
 from fastapi import Body, Depends, status, APIRouter,  BackgroundTasks
 from fastapi.responses import JSONResponse
-from ..db.main import get_session
+from ..db.main import get_session, get_read_session, get_pool_status, engines
 from sqlmodel.ext.asyncio.session import AsyncSession
 from ..schemas import AdminLoginModel, AdminCreateModel, AdminUpdateModel, AdminProfileModel
-from ..service import TokenService, AdminService
-from ..utils import create_access_token, verify_passwd_hash
+from ..service import TokenService, AdminService, UserService, response_cache
+from ..utils import create_access_token, verify_and_update_passwd
 from datetime import timedelta
-from ..dependencies import AccessTokenBearer, RoleChecker, check_revoked_token, get_current_user
+from ..dependencies import access_token_bearer, RoleChecker, check_revoked_token, get_current_user
 from ..errors import InvalidCredentials
 from ..models import UserRole
 from typing import List
@@ -18,6 +18,7 @@ router = APIRouter(
 )
 
 admin = AdminService()
+user_service = UserService()
 revoked_token = TokenService()
 role_checker = Depends(RoleChecker(["admin"]))
 revoked_token_check = Depends(check_revoked_token)
@@ -43,9 +44,14 @@ async def login_admin(login_data: AdminLoginModel = Body(...), session: AsyncSes
 
     existing_admin = await admin.get_admin_by_email(admin_email, session=session)
     if existing_admin is not None:
-        passwd_valid = verify_passwd_hash(password=login_data.password, hashed_password=existing_admin.password)
+        # Give the connection back to the pool while the hash is checked
+        await session.close()
+        passwd_valid, new_hash = await verify_and_update_passwd(password=login_data.password, hashed_password=existing_admin.password)
 
         if passwd_valid:
+            if new_hash is not None:
+                await user_service.rehash_password(existing_admin, new_hash, session)
+
             access_token = create_access_token(user_data={
                 'email': existing_admin.email,
                 'user_uid': str(existing_admin.uid),
@@ -54,7 +60,8 @@ async def login_admin(login_data: AdminLoginModel = Body(...), session: AsyncSes
         
             refresh_token = create_access_token(user_data={
                 'email': existing_admin.email,
-                'user_uid': str(existing_admin.uid)
+                'user_uid': str(existing_admin.uid),
+                'role': existing_admin.role
             },
             refresh=True,
             expiry=timedelta(days=2)
@@ -80,16 +87,26 @@ async def get_user_profile(user = Depends(get_current_user)):
     return user
 
 @router.get('/get/all', dependencies=[role_checker, revoked_token_check], response_model = List[AdminProfileModel])
-async def get_all_editors(session: AsyncSession = Depends(get_session)):
+async def get_all_editors(session: AsyncSession = Depends(get_read_session)):
     admin_q = await admin.get_all_admins(session)
 
     return admin_q
 
 
+@router.get('/db/pool', dependencies=[role_checker, revoked_token_check])
+async def get_db_pool_status():
+    return {name: get_pool_status(name) for name in engines}
+
+
+@router.get('/cache/stats', dependencies=[role_checker, revoked_token_check])
+async def get_response_cache_stats():
+    return response_cache.stats()
+
+
 @router.get("/logout")
-async def logout_user(token_details: dict = Depends(AccessTokenBearer()), session: AsyncSession = Depends(get_session)):
+async def logout_user(token_details: dict = Depends(access_token_bearer), session: AsyncSession = Depends(get_session)):
 
-    await revoked_token.add_token_to_blacklist(session=session, token_jti= token_details['jti'])
+    await revoked_token.add_token_to_blacklist(session=session, token_jti= token_details['jti'], expires_at= token_details['exp'])
 
     return JSONResponse(
         content={
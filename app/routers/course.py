@@ -1,11 +1,14 @@
-from fastapi import Depends, APIRouter
-from ..db.main import get_session
+from fastapi import Depends, APIRouter, Query, Request, Response
+from ..db.main import get_session, get_read_session
 from sqlmodel.ext.asyncio.session import AsyncSession
-from ..schemas import (CourseCreateModel, CourseUpdateModel, CourseResponseModel)
-from ..service import (CourseService, TokenService)
+from ..schemas import (CourseCreateModel, CourseUpdateModel, CourseResponseModel, CoursePageResponseModel, CourseSearchPageResponseModel, CourseTermsResponseModel)
+from ..models import CourseType
+from ..service import (CourseService, TokenService, response_cache)
+from ..cache import course_namespace, weak_etag, not_modified, not_modified_response, CATALOGUE, COURSES
 from datetime import timedelta, datetime
-from ..dependencies import (get_current_user, RoleChecker,check_revoked_token)
-from typing import List
+from ..dependencies import (get_token_user, RoleChecker,check_revoked_token)
+from typing import Optional
+import uuid
 
 router = APIRouter(
     prefix="/course",
@@ -19,23 +22,70 @@ role_checker = Depends(RoleChecker(['editor', 'admin']))
 revoked_token_check = Depends(check_revoked_token)
 
 
-@router.get('/get/all', dependencies=[revoked_token_check], response_model=List[CourseResponseModel])
-async def get_all_courses(session: AsyncSession = Depends(get_session)):
-    course_q = await course.get_all_courses(session)
+@router.get('/get/all', dependencies=[revoked_token_check], response_model=CoursePageResponseModel)
+async def get_all_courses(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    type: Optional[CourseType] = None,
+    author: Optional[uuid.UUID] = None,
+    tag: Optional[int] = None,
+    include_body: bool = False,
+    session: AsyncSession = Depends(get_read_session)
+):
+    tags = None if tag is None else [tag]
+
+    return await response_cache.fetch(
+        request,
+        [CATALOGUE, COURSES],
+        lambda: course.get_all_courses(session, cursor=cursor, limit=limit, type=type, author=author, tags=tags, include_body=include_body),
+        CoursePageResponseModel,
+        lambda: course.get_courses_version(session, cursor=cursor, limit=limit, type=type, author=author, tags=tags)
+    )
+
+
+
+@router.get('/search', dependencies=[revoked_token_check], response_model=CourseSearchPageResponseModel)
+async def search_courses(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_read_session)
+):
+    return await response_cache.fetch(
+        request,
+        [CATALOGUE, COURSES],
+        lambda: course.search_courses(session, q, cursor=cursor, limit=limit),
+        CourseSearchPageResponseModel
+    )
 
-    return course_q
+
+@router.get('/get/{course_uid}', dependencies=[ revoked_token_check], response_model=CourseResponseModel)
+async def get_course_by_uid(request: Request, course_uid: uuid.UUID, session: AsyncSession = Depends(get_read_session)):
+    return await response_cache.fetch(
+        request,
+        [CATALOGUE, course_namespace(course_uid)],
+        lambda: course.get_course_by_uid(course_uid, session),
+        CourseResponseModel,
+        lambda: course.get_course_version(course_uid, session)
+    )
 
 
+@router.get('/get/{course_uid}/terms', dependencies=[revoked_token_check], response_model=CourseTermsResponseModel)
+async def get_course_terms(request: Request, response: Response, course_uid: uuid.UUID, session: AsyncSession = Depends(get_read_session)):
+    etag = weak_etag(request, await course.get_course_version(course_uid, session))
+    if not_modified(request, etag):
+        return not_modified_response(etag)
 
-@router.get('/get/{course_uid}', dependencies=[ revoked_token_check], response_model=CourseResponseModel)
-async def get_course_by_uid(course_uid: str, session: AsyncSession = Depends(get_session)):
-    course_q = await course.get_course_by_uid(course_uid, session)
+    course_q = await course.get_course_terms(course_uid, session)
+    response.headers["ETag"] = etag
 
     return course_q
 
 
 @router.post('/create', dependencies=[role_checker, revoked_token_check])
-async def create_course(course_data: CourseCreateModel, current_user = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+async def create_course(course_data: CourseCreateModel, current_user = Depends(get_token_user), session: AsyncSession = Depends(get_session)):
     user_uid = current_user.uid
     course_q = await course.create_course(user_uid, course_data, session)
 
@@ -1,11 +1,13 @@
-from fastapi import Depends, APIRouter
-from typing import List
-from ..db.main import get_session
+from fastapi import Depends, APIRouter, Query, Request, Response
+from ..db.main import get_read_session
 from sqlmodel.ext.asyncio.session import AsyncSession
-from ..service import (CourseTagService, TokenService)
+from ..service import (CourseService, CourseTagService, TokenService, response_cache)
+from ..cache import weak_etag, not_modified, not_modified_response, CATALOGUE, COURSES
 from ..dependencies import (RoleChecker,check_revoked_token)
-from ..schemas import CourseResponseModel
-from typing import List
+from ..schemas import CoursePageResponseModel
+from ..models import TagMatch
+from ..errors import InvalidTagFilter
+from typing import Optional
 import uuid
 
 router = APIRouter(
@@ -14,23 +16,65 @@ router = APIRouter(
 )
 
 course_tag = CourseTagService()
+course = CourseService()
 revoked_token = TokenService()
 
 role_checker = Depends(RoleChecker(['admin', 'editor']))
 revoked_token_check = Depends(check_revoked_token)
 
+MAX_FILTER_TAGS = 10
 
 
+@router.get("/courses", dependencies=[revoked_token_check], response_model=CoursePageResponseModel)
+async def get_courses_by_tags(
+    request: Request,
+    tags: str,
+    mode: TagMatch = TagMatch.ANY,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_body: bool = False,
+    session: AsyncSession = Depends(get_read_session)
+):
+    try:
+        tag_ids = [int(tag_id) for tag_id in tags.split(',')]
+    except ValueError:
+        raise InvalidTagFilter()
+    if len(tag_ids) > MAX_FILTER_TAGS:
+        raise InvalidTagFilter()
 
-@router.get("/courses/{tag_id}/all", dependencies=[revoked_token_check], response_model=List[CourseResponseModel])
-async def get_all_tag_courses(tag_id: int, session: AsyncSession = Depends(get_session)):
-    courses = await course_tag.get_all_tag_courses(tag_id, session)
+    return await response_cache.fetch(
+        request,
+        [CATALOGUE, COURSES],
+        lambda: course_tag.get_all_tag_courses(tag_ids, session, cursor=cursor, limit=limit, tag_match=mode, include_body=include_body),
+        CoursePageResponseModel,
+        lambda: course.get_courses_version(session, cursor=cursor, limit=limit, tags=tag_ids, tag_match=mode)
+    )
 
-    return courses
+@router.get("/courses/{tag_id}/all", dependencies=[revoked_token_check], response_model=CoursePageResponseModel)
+async def get_all_tag_courses(
+    request: Request,
+    tag_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_body: bool = False,
+    session: AsyncSession = Depends(get_read_session)
+):
+    return await response_cache.fetch(
+        request,
+        [CATALOGUE, COURSES],
+        lambda: course_tag.get_all_tag_courses([tag_id], session, cursor=cursor, limit=limit, include_body=include_body),
+        CoursePageResponseModel,
+        lambda: course.get_courses_version(session, cursor=cursor, limit=limit, tags=[tag_id])
+    )
 
 @router.get("/tags/{course_uid}/all", dependencies=[revoked_token_check])
-async def get_all_course_tags(course_uid: uuid.UUID, session: AsyncSession = Depends(get_session)):
+async def get_all_course_tags(request: Request, response: Response, course_uid: uuid.UUID, session: AsyncSession = Depends(get_read_session)):
+    etag = weak_etag(request, await course.get_course_version(course_uid, session))
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+
     tags = await course_tag.get_all_course_tags(course_uid, session)
+    response.headers["ETag"] = etag
 
     return tags
 
@@ -1,5 +1,11 @@
-from fastapi import APIRouter
-from ..dictionary.main import DictionaryService
+from fastapi import APIRouter, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from datetime import datetime, timedelta, timezone
+import hashlib
+from ..dictionary.main import DictionaryService, get_definition_index, get_term_graph, wait_for_index
+from ..cache import not_modified
+from ..schemas import FuzzyTerm, DefinitionSearchResponse, TermBatchModel, BatchTermDefinition, AnnotateModel, TermAnnotation, LetterPageResponse, RelatedTermsResponse
+from typing import List, Optional
 
 
 router = APIRouter(
@@ -9,17 +15,69 @@ router = APIRouter(
 
 dictionary = DictionaryService()
 
+# The longest term is 72 characters; the cap keeps fuzzy rescoring, which grows with the query length, cheap
+MAX_TERM_QUERY = 100
+
 @router.get('/')
-async def get_term_definition(q: str):
+async def get_term_definition(q: str = Query(..., max_length=MAX_TERM_QUERY)):
   res = dictionary.get_term_definition(q)
   return res
 
+@router.post('/batch', response_model=List[BatchTermDefinition])
+async def get_term_definitions(batch: TermBatchModel):
+  res = dictionary.get_term_definitions(batch.terms)
+  return res
+
 @router.get('/term/')
-async def get_similar_terms(q: str):
-  res = dictionary.get_terms(q)
+async def get_similar_terms(q: str = Query(..., max_length=MAX_TERM_QUERY), limit: int = Query(10, ge=1, le=100), offset: int = Query(0, ge=0)):
+  res = dictionary.get_terms(q, limit=limit, offset=offset)
+  return res
+
+@router.get('/fuzzy', response_model=List[FuzzyTerm])
+async def get_fuzzy_terms(q: str = Query(..., max_length=MAX_TERM_QUERY), limit: int = Query(5, ge=1, le=50)):
+  res = dictionary.get_fuzzy_terms(q, limit=limit)
+  return res
+
+@router.get('/search', response_model=DefinitionSearchResponse)
+async def search_definitions(q: str = Query(..., max_length=200), limit: int = Query(10, ge=1, le=50), offset: int = Query(0, ge=0)):
+  await wait_for_index(get_definition_index)
+  res = dictionary.search_definitions(q, limit=limit, offset=offset)
+  return res
+
+@router.post('/annotate', response_model=List[TermAnnotation])
+async def annotate_text(body: AnnotateModel):
+  res = dictionary.annotate_text(body.text)
+  return res
+
+@router.get('/related', response_model=RelatedTermsResponse)
+async def get_related_terms(q: str = Query(..., max_length=MAX_TERM_QUERY)):
+  await wait_for_index(get_term_graph)
+  res = dictionary.get_related_terms(q)
+  return res
+
+@router.get('/letter/{letter}', response_model=LetterPageResponse)
+async def get_letter_terms(letter: str, cursor: Optional[str] = None, limit: int = Query(50, ge=1, le=200)):
+  res = dictionary.get_letter_terms(letter, cursor=cursor, limit=limit)
   return res
 
 @router.get('/random')
 async def get_random_word():
   res = dictionary.get_random_word()
-  return res
\ No newline at end of file
+  return res
+
+@router.get('/daily')
+async def get_word_of_the_day(request: Request):
+  now = datetime.now(timezone.utc)
+  res = dictionary.get_daily_word(now.date())
+
+  # Every client sees the same word until midnight UTC, so let caches keep it until then
+  midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+  etag = '"%s"' % hashlib.sha1(f"{now.date()}:{res['term']}".encode()).hexdigest()[:16]
+  headers = {
+    'Cache-Control': f"public, max-age={int((midnight - now).total_seconds())}",
+    'ETag': etag
+  }
+
+  if not_modified(request, etag):
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+  return JSONResponse(content=res, headers=headers)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from fastapi import Depends, APIRouter, BackgroundTasks, status
-from ..db.main import get_session
+from ..db.main import get_session, get_read_session
 from sqlmodel.ext.asyncio.session import AsyncSession
 from ..schemas import (UserCreateModel, UserUpdateModel, UserResponseModel, AdminCreateUserModel, EditorResponseModel)
 from ..service import (EditorService, UserService, TokenService)
@@ -23,13 +23,13 @@ revoked_token_check = Depends(check_revoked_token)
 
 
 @router.get('/get/all', dependencies=[role_checker, revoked_token_check], response_model=List[EditorResponseModel])
-async def get_all_editors(session: AsyncSession = Depends(get_session)):
+async def get_all_editors(session: AsyncSession = Depends(get_read_session)):
     editor_q = await editor.get_all_editors(session)
 
     return editor_q
 
 @router.get('/get/{editor_uid}', dependencies=[role_checker, revoked_token_check], response_model=UserResponseModel)
-async def get_editor_by_uid(editor_uid: str, session: AsyncSession = Depends(get_session)):
+async def get_editor_by_uid(editor_uid: str, session: AsyncSession = Depends(get_read_session)):
     editor_q = await editor.get_editor_by_uid(editor_uid, session)
 
     return editor_q
@@ -1,9 +1,10 @@
-from fastapi import Depends, APIRouter, status
-from ..db.main import get_session
+from fastapi import Depends, APIRouter, status, Request, Response
+from ..db.main import get_session, get_read_session
 from sqlmodel.ext.asyncio.session import AsyncSession
 from ..schemas import (TagModel)
 from ..service import (TagService, TokenService)
 from ..dependencies import (RoleChecker,check_revoked_token)
+from ..cache import weak_etag, not_modified, not_modified_response
 
 
 router = APIRouter(
@@ -20,26 +21,46 @@ revoked_token_check = Depends(check_revoked_token)
 
 
 @router.get('/get/all', dependencies=[revoked_token_check])
-async def get_all_tags(session: AsyncSession = Depends(get_session)):
+async def get_all_tags(request: Request, response: Response, session: AsyncSession = Depends(get_read_session)):
+    etag = weak_etag(request, await tag.get_tags_version(session))
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+
     tag_q = await tag.get_all_tags(session)
+    response.headers["ETag"] = etag
 
     return tag_q
 
 @router.get('/name/{query}', dependencies=[ revoked_token_check])
-async def get_all_tags(query:str = None, session: AsyncSession = Depends(get_session)):
+async def get_all_tags(request: Request, response: Response, query:str = None, session: AsyncSession = Depends(get_read_session)):
+    etag = weak_etag(request, await tag.get_tags_version(session))
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+
     tag_q = await tag.get_all_tag_name(query=query, session=session)
+    response.headers["ETag"] = etag
 
     return tag_q
 
 @router.get('/get/{tag_id}', dependencies=[role_checker, revoked_token_check])
-async def get_tag_by_uid(tag_id: int, session: AsyncSession = Depends(get_session)):
+async def get_tag_by_uid(request: Request, response: Response, tag_id: int, session: AsyncSession = Depends(get_read_session)):
+    etag = weak_etag(request, await tag.get_tags_version(session))
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+
     tag_q = await tag.get_tag_by_id(tag_id, session)
+    response.headers["ETag"] = etag
 
     return tag_q
 
 @router.get('/name/{tag_name}', dependencies=[role_checker, revoked_token_check])
-async def get_tag_by_uid(tag_name: str, session: AsyncSession = Depends(get_session)):
+async def get_tag_by_uid(request: Request, response: Response, tag_name: str, session: AsyncSession = Depends(get_read_session)):
+    etag = weak_etag(request, await tag.get_tags_version(session))
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+
     tag_q = await tag.get_tag_by_name(tag_name, session)
+    response.headers["ETag"] = etag
 
     return tag_q
 
@@ -1,12 +1,12 @@
 from fastapi import status, Body, Depends, APIRouter, BackgroundTasks, HTTPException
 from fastapi.responses import JSONResponse
-from ..db.main import get_session
+from ..db.main import get_session, get_read_session
 from sqlmodel.ext.asyncio.session import AsyncSession
 from ..schemas import (UserCreateModel, UserUpdateModel, UserResponseModel, UserLoginModel, AdminEditorResponseProfileModel)
 from ..service import (UserService, TokenService)
-from ..utils import (create_access_token, verify_passwd_hash, decode_safe_url)
+from ..utils import (create_access_token, verify_and_update_passwd, decode_safe_url)
 from datetime import timedelta, datetime
-from ..dependencies import (RefreshTokenBearer, AccessTokenBearer, get_current_user, RoleChecker,check_revoked_token)
+from ..dependencies import (refresh_token_bearer, access_token_bearer, get_current_user, get_token_user, RoleChecker,check_revoked_token)
 from ..errors import (InvalidToken, InvalidCredentials, UserNotFound)
 
 
@@ -35,9 +35,14 @@ async def login_user(login_data: UserLoginModel = Body(...), session: AsyncSessi
     existing_user = await user.get_all_user_by_email(user_email, session)
 
     if existing_user is not None:
-        passwd_valid = verify_passwd_hash(password=login_data.password, hashed_password=existing_user.password)
+        # Give the connection back to the pool while the hash is checked
+        await session.close()
+        passwd_valid, new_hash = await verify_and_update_passwd(password=login_data.password, hashed_password=existing_user.password)
 
         if passwd_valid:
+            if new_hash is not None:
+                await user.rehash_password(existing_user, new_hash, session)
+
             access_token = create_access_token(user_data={
                 'email': existing_user.email,
                 'user_uid': str(existing_user.uid),
@@ -46,7 +51,8 @@ async def login_user(login_data: UserLoginModel = Body(...), session: AsyncSessi
         
             refresh_token = create_access_token(user_data={
                 'email': existing_user.email,
-                'user_uid': str(existing_user.uid)
+                'user_uid': str(existing_user.uid),
+                'role': existing_user.role
             },
             refresh=True,
             expiry=timedelta(days=2)
@@ -80,22 +86,22 @@ async def get_user_profile(user = Depends(get_current_user)):
     return user
 
 @router.get('/role', dependencies=[role_checker, revoked_token_check])
-async def get_user_role(current_user = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+async def get_user_role(current_user = Depends(get_token_user), session: AsyncSession = Depends(get_read_session)):
     role = await user.get_user_role(current_user.uid, session)
     return role
 
 @router.put('/update_user', dependencies=[role_checker, revoked_token_check], response_model=UserResponseModel)
-async def update_user_profile(user_data: UserUpdateModel = Body(...), current_user = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+async def update_user_profile(user_data: UserUpdateModel = Body(...), current_user = Depends(get_token_user), session: AsyncSession = Depends(get_session)):
     result = await user.update_a_user(current_user.uid, user_data, session)
     return result
 
 @router.put('/make_premium', dependencies=[role_checker, revoked_token_check], response_model=UserResponseModel)
-async def update_user_profile( current_user = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+async def update_user_profile( current_user = Depends(get_token_user), session: AsyncSession = Depends(get_session)):
     result = await user.update_user_data(current_user.uid, {"is_premium": True}, session)
     return result
 
 @router.get('/refresh_token')
-async def get_new_access_token(token_details: dict = Depends(RefreshTokenBearer())):
+async def get_new_access_token(token_details: dict = Depends(refresh_token_bearer)):
 
     expiry_timestamp = token_details['exp']
 
@@ -113,9 +119,9 @@ async def get_new_access_token(token_details: dict = Depends(RefreshTokenBearer(
     raise InvalidToken()
 
 @router.get("/logout")
-async def logout_user(token_details: dict = Depends(AccessTokenBearer()), session: AsyncSession = Depends(get_session)):
+async def logout_user(token_details: dict = Depends(access_token_bearer), session: AsyncSession = Depends(get_session)):
 
-    await revoked_token.add_token_to_blacklist(session=session, token_jti= token_details['jti'])
+    await revoked_token.add_token_to_blacklist(session=session, token_jti= token_details['jti'], expires_at= token_details['exp'])
 
     return JSONResponse(
         content={
@@ -141,7 +147,7 @@ async def verify_safe_url(url:str, session: AsyncSession = Depends(get_session))
     return {"message": "Email verified successfully"}
 
 @router.delete('/delete_account', status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user_account(current_user = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+async def delete_user_account(current_user = Depends(get_token_user), session: AsyncSession = Depends(get_session)):
     await user.delete_a_user(current_user.uid, session)
     return JSONResponse(
         content={
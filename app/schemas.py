@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Annotated
 from datetime import datetime
 import uuid
 
@@ -148,13 +148,33 @@ class CourseResponseModel(BaseModel):
     type: Optional[str]
     thumbnail: Optional[str] 
     description: Optional[str]
-    courses: dict
+    courses: Optional[dict] = None
     created_at: datetime 
     updated_at: datetime 
     likes_count: int
     user: Optional['UserResponseModelProfile']
     tags: List['TagResponseModel']
 
+class CoursePageResponseModel(BaseModel):
+    courses: List[CourseResponseModel]
+    next_cursor: Optional[str] = None
+
+class CourseSearchResultModel(BaseModel):
+    uid: uuid.UUID
+    title: str
+    type: Optional[str]
+    thumbnail: Optional[str]
+    description: Optional[str]
+    likes_count: int
+    created_at: datetime
+    updated_at: datetime
+    rank: float
+    headline: str
+
+class CourseSearchPageResponseModel(BaseModel):
+    results: List[CourseSearchResultModel]
+    next_cursor: Optional[str] = None
+
 
 # TAGS
 class Tag(BaseModel):
@@ -185,6 +205,56 @@ class TermDefinition(BaseModel):
     term: str
     definition: str
 
+class TermBatchModel(BaseModel):
+    # Each term is capped like the q of the single lookup; the longest term is 72 characters
+    terms: List[Annotated[str, Field(max_length=100)]] = Field(max_length=200)
+
+class BatchTermDefinition(TermDefinition):
+    definition: Optional[str] = None
+    found: bool
+
+class AnnotateModel(BaseModel):
+    # About 15,000 words, longer than any course body; the scan and the response grow with it
+    text: str = Field(max_length=100_000)
+
+class TermAnnotation(BaseModel):
+    term: str
+    start: int
+    end: int
+
+class CourseTermAnnotation(TermAnnotation):
+    path: str
+
+class CourseTermsResponseModel(BaseModel):
+    title: List[TermAnnotation]
+    description: List[TermAnnotation]
+    courses: List[CourseTermAnnotation]
+
+class LetterPageResponse(BaseModel):
+    letter: str
+    total: int
+    terms: List[str]
+    next_cursor: Optional[str] = None
+
+class RelatedTermsResponse(BaseModel):
+    term: str
+    references: List[str]
+    referenced_by: List[str]
+    two_hop: List[str]
+
+class FuzzyTerm(BaseModel):
+    term: str
+    score: float
+
+class DefinitionSearchHit(BaseModel):
+    term: str
+    score: float
+    snippet: str
+
+class DefinitionSearchResponse(BaseModel):
+    total: int
+    results: List[DefinitionSearchHit]
+
 
 # LIKES
 
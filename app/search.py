@@ -0,0 +1,187 @@
+import math
+import re
+import uuid
+from typing import Iterable, List, Optional, Tuple
+
+# Postgres' english stop words, which to_tsvector drops as well
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can did do does doing down during each few for from further had has have having he her here
+hers herself him himself his how i if in into is it its itself just me more most my myself no nor not now
+of off on once only or other our ours ourselves out over own s same she should so some such t than that the
+their theirs them themselves then there these they this those through to too under until up very was we
+were what when where which while who whom why will with you your yours yourself yourselves
+""".split())
+
+# ts_rank's default weights for the A (title), B (description) and C (body) parts of the vector
+WEIGHTS = (1.0, 0.4, 0.2)
+
+WORD = re.compile(r"[^\W_]+")
+QUERY_TOKEN = re.compile(r'-?"[^"]*"?|\S+')
+
+# stem() strips at most one suffix from each group, in this order, and only the first that matches in a group.
+# Plurals go first so a word and its plural reach the later groups alike. The first two groups hold
+# (suffix, replacement, shortest stem left); derivations hold (suffix, replacement, smallest measure of the stem left),
+# which spares short stems such as the cons- of consent
+PLURALS = (("sses", "ss", 0), ("ies", "y", 2), ("xes", "x", 1), ("ches", "ch", 1), ("shes", "sh", 1), ("ss", "ss", 0), ("us", "us", 0), ("is", "is", 0), ("s", "", 3))
+VERB_ENDINGS = (("ingly", "", 3), ("edly", "", 3), ("ing", "", 3), ("ed", "", 3), ("ly", "", 3))
+DERIVATIONS = (
+    ("ational", "ate", 1), ("ization", "ize", 1), ("fulness", "ful", 1), ("ousness", "ous", 1), ("iveness", "ive", 1),
+    ("ment", "", 2), ("ence", "", 2), ("ance", "", 2), ("ent", "", 2), ("ant", "", 2),
+)
+
+
+def measure(word: str) -> int:
+    """Porter's m, the number of vowel-consonant sequences in word"""
+    m = 0
+    previous_vowel = False
+    for i, char in enumerate(word):
+        vowel = char in "aeiou" or (char == "y" and i > 0 and not previous_vowel)
+        if previous_vowel and not vowel:
+            m += 1
+        previous_vowel = vowel
+    return m
+
+
+def stem(word: str) -> str:
+    """Strips the common english suffixes; cruder than the Snowball stemmer Postgres uses, but applied alike to documents and queries"""
+    for suffix, replacement, shortest in PLURALS:
+        if word.endswith(suffix):
+            if len(word) - len(suffix) >= shortest:
+                word = word[:-len(suffix)] + replacement
+            break
+    for suffix, replacement, shortest in VERB_ENDINGS:
+        if word.endswith(suffix):
+            if len(word) - len(suffix) >= shortest:
+                word = word[:-len(suffix)] + replacement
+            break
+    for suffix, replacement, smallest in DERIVATIONS:
+        if word.endswith(suffix):
+            if measure(word[:-len(suffix)]) >= smallest:
+                word = word[:-len(suffix)] + replacement
+            break
+    return word
+
+
+def lexemes(text: str) -> List[str]:
+    return [stem(word) for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def json_strings(value) -> Iterable[str]:
+    """Every string value inside a JSON document, as jsonb_to_tsvector(..., '["string"]') reads it"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from json_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from json_strings(item)
+
+
+class SearchQuery:
+    """The subset of websearch_to_tsquery the fallback understands.
+
+    Words are all required, `a or b` needs either, a quoted phrase needs its
+    words next to each other in one field (stop words aside) and a leading
+    `-` excludes.
+    """
+
+    def __init__(self, text: str) -> None:
+        # Each clause is a list of alternatives, each alternative the lexemes of one word or phrase
+        self.required: List[List[List[str]]] = []
+        self.excluded: List[List[str]] = []
+        join_next = False
+        for token in QUERY_TOKEN.findall(text):
+            if token.lower() == "or":
+                join_next = bool(self.required)
+                continue
+            negated = token.startswith("-")
+            words = lexemes(token.lstrip("-"))
+            if not words:
+                continue
+            if negated:
+                self.excluded.append(words)
+            elif join_next:
+                self.required[-1].append(words)
+            else:
+                self.required.append([words])
+            join_next = False
+
+        self.terms = {word for clause in self.required for alternative in clause for word in alternative}
+
+    @staticmethod
+    def contains(fields: Tuple[List[str], ...], words: List[str]) -> bool:
+        if len(words) == 1:
+            return any(words[0] in field for field in fields)
+        return any(
+            field[i:i + len(words)] == words
+            for field in fields
+            for i in range(len(field) - len(words) + 1)
+        )
+
+    def matches(self, fields: Tuple[List[str], ...]) -> bool:
+        if not self.required:
+            return False
+        if any(self.contains(fields, words) for words in self.excluded):
+            return False
+        return all(any(self.contains(fields, alternative) for alternative in clause) for clause in self.required)
+
+
+def rank(query: SearchQuery, fields: Tuple[List[str], ...]) -> float:
+    """Weighted, log-damped term frequency over the title, description and body lexemes"""
+    score = 0.0
+    for weight, words in zip(WEIGHTS, fields):
+        for term in query.terms:
+            count = words.count(term)
+            if count:
+                score += weight * math.log2(1 + count)
+    return score / max(len(query.terms), 1)
+
+
+def headline(query: SearchQuery, text: str, max_words: int = 20, max_fragments: int = 2) -> str:
+    """Up to max_fragments windows of text around the matched words, which are wrapped in <b></b> as ts_headline does"""
+    words = text.split()
+    hits = [i for i, word in enumerate(words) if any(stem(part) in query.terms for part in WORD.findall(word.lower()))]
+    highlighted = set(hits)
+    if not hits:
+        return " ".join(words[:max_words])
+
+    fragments = []
+    end = -1
+    for hit in hits:
+        if hit <= end:
+            continue
+        start = max(hit - max_words // 4, end + 1)
+        end = min(start + max_words, len(words)) - 1
+        fragments.append(" ".join(
+            f"<b>{word}</b>" if i in highlighted else word
+            for i, word in enumerate(words[start:end + 1], start)
+        ))
+        if len(fragments) == max_fragments:
+            break
+    return " ... ".join(fragments)
+
+
+def search(rows, text: str, limit: int, after: Optional[Tuple[float, uuid.UUID]] = None):
+    """Ranks rows with title, description and courses attributes, returning (rank, headline, row) for the page after the cursor key.
+
+    Ordered by rank then uid, both descending, to page the same way as the Postgres search.
+    """
+    query = SearchQuery(text)
+    scored = []
+    for row in rows:
+        body = " ".join(json_strings(row.courses or {}))
+        fields = (lexemes(row.title or ""), lexemes(row.description or ""), lexemes(body))
+        if not query.matches(fields):
+            continue
+        key = (rank(query, fields), row.uid)
+        if after is not None and key >= after:
+            continue
+        scored.append((key, body, row))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [
+        (key[0], headline(query, " ".join(part for part in (row.title, row.description, body) if part)), row)
+        for key, body, row in scored[:limit]
+    ]
@@ -1,25 +1,58 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func, tuple_, type_coerce, literal, literal_column, JSON, REAL
+from sqlalchemy.dialects.postgresql import aggregate_order_by, TSVECTOR
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, raiseload
 from fastapi import Body, HTTPException, status, BackgroundTasks
 from .schemas import (RevokedTokenModel, UserCreateModel, UserUpdateModel, AdminCreateModel, AdminUpdateModel, CourseCreateModel, CourseUpdateModel, TagModel, AdminCreateUserModel)
-from .models import (RevokedToken, User, UserRole, Course, Tag, CourseTag, Like)
-from sqlmodel import select, desc
-from .utils import generate_passwd_hash, create_safe_url, generate_password
-from .errors import (UserAlreadyExists, AdminAlreadyExists, EditorAlreadyExists, CourseAlreadyExists, CourseNotFound, UserNotFound, EditorNotFound, AdminNotFound, TagNotFound, TagAlreadyExists)
+from .models import (RevokedToken, User, UserRole, Course, CourseType, TagMatch, Tag, CourseTag, Like)
+from sqlmodel import select, desc, delete, update
+from .utils import hash_passwd, create_safe_url, generate_password, encode_cursor, decode_cursor, ACCESS_TOKEN_EXPIRE
+from .errors import (UserAlreadyExists, AdminAlreadyExists, EditorAlreadyExists, CourseAlreadyExists, CourseNotFound, UserNotFound, EditorNotFound, AdminNotFound, TagNotFound, TagAlreadyExists, InvalidCursor)
 from .config import settings
 from .mail import create_message, mail
-from typing import List
+from .dictionary.main import term_annotator
+from .db.main import Session
+from .revocation import RevocationCache
+from .search import search as python_search
+from .cache import build_response_cache, course_namespace, CATALOGUE, COURSES
+from typing import List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import time
+import uuid
+
+
+revocation_cache = RevocationCache(settings.REVOKED_TOKEN_BLOOM_CAPACITY, settings.REVOKED_TOKEN_SYNC_SECONDS)
+
+response_cache = build_response_cache(settings.RESPONSE_CACHE_BACKEND, settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL, settings.REDIS_URL)
+
+async def author_course_uids(user_uid, session: AsyncSession) -> List[uuid.UUID]:
+    result = await session.exec(select(Course.uid).where(Course.user_uid == user_uid))
+    return result.all()
+
+
+async def invalidate_author(course_uids: List[uuid.UUID]) -> None:
+    """Drops the cached lists and course pages that embed an author who was edited or deleted along with their courses"""
+    if course_uids:
+        await response_cache.invalidate(COURSES, *(course_namespace(uid) for uid in course_uids))
+
+# Rows committed up to this long after their revoked_at timestamp are still picked up by the next sync
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=30)
 
 
 class TokenService:
-    async def add_token_to_blacklist(self, session:AsyncSession, token_jti: RevokedTokenModel):
+    async def add_token_to_blacklist(self, session:AsyncSession, token_jti: RevokedTokenModel, expires_at: int = None):
         try:
             new_revoked_token = RevokedToken(
-                token_jti= token_jti
+                token_jti= token_jti,
+                expires_at= expires_at if expires_at is not None else int(time.time()) + ACCESS_TOKEN_EXPIRE
             )
 
             session.add(new_revoked_token)
             await session.commit()
+            revocation_cache.add(token_jti)
 
             return new_revoked_token
         except Exception as e:
@@ -34,6 +67,56 @@ class TokenService:
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error is {e}")
 
+    async def sync_revoked_tokens(self, session: AsyncSession):
+        """Loads the unexpired revoked tokens into the local filter, or only those revoked since the last sync"""
+        statement = select(RevokedToken.token_jti, RevokedToken.revoked_at).where(RevokedToken.expires_at > int(time.time()))
+
+        if revocation_cache.needs_reset():
+            result = await session.exec(statement)
+            revocation_cache.reset(result.all())
+            if revocation_cache.watermark is None:
+                # Nothing unexpired to load; start from the newest row, expired or not
+                result = await session.exec(select(func.max(RevokedToken.revoked_at)))
+                revocation_cache.watermark = result.one()
+            return
+
+        if revocation_cache.watermark is not None:
+            statement = statement.where(RevokedToken.revoked_at > revocation_cache.watermark - REVOCATION_SYNC_OVERLAP)
+        result = await session.exec(statement)
+        revocation_cache.update(result.all())
+
+    async def is_token_revoked(self, token_jti: str) -> bool:
+        """Checks token_jti against the local filter, only querying the database on a possible hit"""
+        if revocation_cache.due():
+            async with revocation_cache.lock:
+                if revocation_cache.due():
+                    async with Session() as session:
+                        await self.sync_revoked_tokens(session)
+
+        if not revocation_cache.might_contain(token_jti):
+            return False
+
+        async with Session() as session:
+            return bool(await self.get_token_from_blacklist(session, token_jti))
+
+    async def purge_expired_tokens(self, session: AsyncSession) -> int:
+        statement = delete(RevokedToken).where(RevokedToken.expires_at <= int(time.time()))
+        result = await session.exec(statement)
+        await session.commit()
+
+        # Rebuild the filter without the purged tokens on the next check
+        revocation_cache.clear()
+        return result.rowcount
+
+    async def purge_expired_tokens_periodically(self):
+        while True:
+            await asyncio.sleep(settings.REVOKED_TOKEN_PURGE_SECONDS)
+            try:
+                async with Session() as session:
+                    await self.purge_expired_tokens(session)
+            except Exception as e:
+                logging.exception(e)
+
 class UserService:
     async def get_user_by_uid(self, uid: str, session: AsyncSession):
         user = select(User).where((User.uid == uid) & (User.role == UserRole.USER.value))
@@ -45,12 +128,13 @@ class UserService:
         return result.first()
 
     async def get_user_role(self, uid: str, session: AsyncSession):
-        user = select(User).where(User.uid == uid)
+        user = select(User.role).where(User.uid == uid)
         result = await session.exec(user)
 
-        if result is None:
+        role = result.first()
+        if role is None:
             raise UserNotFound()
-        return result.first().role
+        return role
 
     async def get_user_by_email(self, email: str, session: AsyncSession):
         user = select(User).where((User.email == email) & (User.role == UserRole.USER.value))
@@ -84,13 +168,13 @@ class UserService:
 
         email = user_data_dict["email"]
 
-        if await self.get_user_by_email(email, session):
+        if await self.get_all_user_by_email(email, session):
             raise UserAlreadyExists()
         
         new_user = User(
             **user_data_dict
         )
-        new_user.password = generate_passwd_hash(new_user.password)
+        new_user.password = await hash_passwd(new_user.password)
 
         #######################
         safe_url = create_safe_url( str(new_user.uid), new_user.email)
@@ -127,6 +211,12 @@ class UserService:
         else:
             raise UserNotFound()
 
+    async def rehash_password(self, user: User, password_hash: str, session: AsyncSession):
+        user.password = password_hash
+        # The login handlers close the session before checking the password
+        session.add(user)
+        await session.commit()
+
     async def update_a_user(self, user_uid: str, user_data: UserUpdateModel, session: AsyncSession):
         user_to_update = await self.get_user_by_uid(user_uid, session)
     
@@ -138,6 +228,7 @@ class UserService:
                 setattr(user_to_update, k, v)
             
             await session.commit()
+            await invalidate_author(await author_course_uids(user_to_update.uid, session))
 
             return user_to_update
         else:
@@ -147,8 +238,10 @@ class UserService:
         user_to_delete = await self.get_user_by_uid(user_uid, session)
 
         if user_to_delete is not None:
+            course_uids = await author_course_uids(user_to_delete.uid, session)
             await session.delete(user_to_delete)
             await session.commit()
+            await invalidate_author(course_uids)
         else:
             raise UserNotFound()
         
@@ -186,14 +279,14 @@ class EditorService:
 
         email = user_data_dict["email"]
 
-        if await self.get_editor_by_email(email, session):
+        if await UserService().get_all_user_by_email(email, session):
             raise EditorAlreadyExists()
         
         new_editor = User(
             **user_data_dict
         )
         new_editor.temporary_password = new_editor.password
-        new_editor.password = generate_passwd_hash(new_editor.password)
+        new_editor.password = await hash_passwd(new_editor.password)
         new_editor.role = UserRole.EDITOR.value
 
         #######################
@@ -228,6 +321,7 @@ class EditorService:
                 setattr(user_to_update, k, v)
             
             await session.commit()
+            await invalidate_author(await author_course_uids(user_to_update.uid, session))
 
             return user_to_update
         else:
@@ -237,8 +331,10 @@ class EditorService:
         user_to_delete = await self.get_editor_by_uid(user_uid, session)
 
         if user_to_delete is not None:
+            course_uids = await author_course_uids(user_to_delete.uid, session)
             await session.delete(user_to_delete)
             await session.commit()
+            await invalidate_author(course_uids)
 
             return {"message": "Editor deleted"}
         else:
@@ -280,7 +376,7 @@ class AdminService:
     async def create_super_admin(self, background_tasks: BackgroundTasks, session: AsyncSession):
         admin_data = {
             "email": settings.SUPER_ADMIN_EMAIL,
-            "password": generate_passwd_hash(settings.SUPER_ADMIN_PASSWORD),
+            "password": await hash_passwd(settings.SUPER_ADMIN_PASSWORD),
             "first_name": settings.SUPER_ADMIN_FIRSTNAME,
             "last_name": settings.SUPER_ADMIN_LASTNAME,
             "phone_number": settings.SUPER_ADMIN_PHONE_NUMBER,
@@ -318,11 +414,11 @@ class AdminService:
         admin_data_dict = admin_data.model_dump()
         email = admin_data_dict["email"]
 
-        if await self.get_admin_by_email(email, session):
+        if await UserService().get_all_user_by_email(email, session):
             raise AdminAlreadyExists()
         
         new_admin = User(**admin_data_dict)
-        new_admin.password = generate_passwd_hash(new_admin.password)
+        new_admin.password = await hash_passwd(new_admin.password)
         new_admin.role = UserRole.ADMIN.value
 
         session.add(new_admin)
@@ -340,20 +436,63 @@ class AdminService:
             for k, v in updated_dict.items():
                 setattr(admin_to_update, k, v)
             await session.commit()
+            await invalidate_author(await author_course_uids(admin_to_update.uid, session))
             return admin_to_update
         raise AdminNotFound()
 
     async def delete_an_admin(self, admin_uid: str, session: AsyncSession):
         admin_to_delete = await self.get_admin_by_uid(admin_uid, session)
         if admin_to_delete:
+            course_uids = await author_course_uids(admin_to_delete.uid, session)
             await session.delete(admin_to_delete)
             await session.commit()
+            await invalidate_author(course_uids)
         else:
             raise AdminNotFound()
         
+# Loads what a course response shows, without the selectin cascade into every course and like of its author
+course_response_options = (
+    selectinload(Course.user).raiseload('*'),
+    selectinload(Course.tags).raiseload('*'),
+    raiseload(Course.likes),
+)
+
+
+def tags_version():
+    """Scalar subqueries for the number of tags and their latest change, which move on any tag create, rename or delete"""
+    return (
+        select(func.count(Tag.id)).scalar_subquery().label("tag_count"),
+        select(func.max(Tag.updated_at)).scalar_subquery().label("tags_updated_at"),
+    )
+
+
+def course_tags_json(dialect: str):
+    """Correlated subquery aggregating a course's tags into a json array of {id, name}"""
+    if dialect == "postgresql":
+        tags = func.json_agg(aggregate_order_by(func.json_build_object("id", Tag.id, "name", Tag.name), Tag.name))
+    else:
+        tags = func.json_group_array(func.json_object("id", Tag.id, "name", Tag.name))
+
+    statement = select(tags).select_from(CourseTag).join(Tag, Tag.id == CourseTag.tag_id).where(CourseTag.course_uid == Course.uid)
+    return type_coerce(statement.scalar_subquery(), JSON)
+
+
+# Inlined rather than bound, since a bound parameter would arrive as varchar and not resolve to regconfig
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+SEARCH_HEADLINE_OPTIONS = literal_column("'MaxFragments=2, MaxWords=20, MinWords=8'")
+# Generated by migration 0007 on Postgres only, so it is not on the model
+search_vector = literal_column("courses.search_vector", TSVECTOR)
+
+
+def course_body_text(courses):
+    """Correlated subquery joining every string value inside a courses document, the text search_vector indexes"""
+    strings = func.jsonb_path_query(courses, literal_column("'strict $.** ? (@.type() == \"string\")'")).alias("value")
+    return select(func.string_agg(literal_column("value #>> '{}'"), " ")).select_from(strings).scalar_subquery()
+
+
 class CourseService:
     async def get_course_by_uid(self, course_uid: str, session: AsyncSession):
-        statement = select(Course).where(Course.uid == course_uid).options(joinedload(Course.likes)).options(joinedload(Course.tags))
+        statement = select(Course).where(Course.uid == course_uid).options(*course_response_options)
         result = await session.exec(statement)
         course = result.first()
         if course is None:
@@ -361,9 +500,10 @@ class CourseService:
         
         course_data = {
             "title": course.title,
+            "type": course.type,
             "description": course.description,
             "thumbnail": course.thumbnail,
-            "likes_count": len(course.likes),
+            "likes_count": course.likes_count or 0,
             "courses": course.courses,
             "uid": course.uid,
             "tags": course.tags,
@@ -374,50 +514,190 @@ class CourseService:
 
         return course_data 
 
-    async def get_all_courses(self, session: AsyncSession):
-        statement = select(Course).order_by(Course.created_at).options(joinedload(Course.likes)).options(joinedload(Course.tags))
-        result = await session.exec(statement)
-        courses = result.unique()
-        courses_data = []
-        for course in courses:
-            course_data = {
-                "title": course.title,
-                "description": course.description,
-                "thumbnail": course.thumbnail,
-                "likes_count": len(course.likes),
-                "courses": course.courses,
-                "uid": course.uid,
-                "tags": course.tags,
-                "user": course.user,
-                "created_at": course.created_at,
-                "updated_at": course.updated_at
-            }
-            courses_data.append(course_data)
+    async def get_course_terms(self, course_uid: str, session: AsyncSession):
+        """This finds every dictionary term in a course's title, description and body"""
+        course = await self.get_course_by_uid(course_uid, session)
 
-        return courses_data 
+        return {
+            "title": term_annotator.annotate(course["title"]),
+            "description": term_annotator.annotate(course["description"] or ""),
+            "courses": term_annotator.annotate_json(course["courses"] or {})
+        }
+
+    async def get_all_courses(self, session: AsyncSession, cursor: str = None, limit: Optional[int] = 20, type: CourseType = None, author: uuid.UUID = None, tags: List[int] = None, tag_match: TagMatch = TagMatch.ANY, include_body: bool = False):
+        """Returns one page of courses ordered by (created_at, uid), starting after cursor.
+
+        Only the columns a course response shows are selected: the author comes
+        from a join and the tags are aggregated into a json array in SQL, so a
+        page is one query returning one row per course. The courses body is
+        left out unless include_body is set. A limit of None returns every
+        matching course.
+
+        tags keeps the courses carrying any of the given tags, or all of them
+        when tag_match is TagMatch.ALL; both are answered from the
+        course_tags (tag_id, course_uid) index.
+        """
+        columns = [
+            Course.uid, Course.title, Course.type, Course.thumbnail, Course.description, Course.likes_count,
+            Course.created_at, Course.updated_at,
+            User.email, User.first_name, User.last_name, User.role,
+            course_tags_json(session.bind.dialect.name).label("tags"),
+        ]
+        if include_body:
+            columns.append(Course.courses)
+
+        statement = select(*columns).select_from(Course).outerjoin(User, User.uid == Course.user_uid)
+        statement = self.filter_courses(statement, cursor, limit, type, author, tags, tag_match)
 
-    async def get_all_user_courses(self, user_uid: str, session: AsyncSession):
-        statement = select(Course).where(Course.user_uid == user_uid).order_by(Course.created_at).options(joinedload(Course.likes)).options(joinedload(Course.tags))
         result = await session.exec(statement)
-        courses = result.unique()
+        rows = result.all()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at.isoformat(), rows[-1].uid)
 
         courses_data = []
-        for course in courses:
+        for row in rows:
             course_data = {
-                "title": course.title,
-                "description": course.description,
-                "thumbnail": course.thumbnail,
-                "likes_count": len(course.likes),
-                "courses": course.courses,
-                "uid": course.uid,
-                "tags": course.tags,
-                "user": course.user,
-                "created_at": course.created_at,
-                "updated_at": course.updated_at
+                "title": row.title,
+                "type": row.type,
+                "description": row.description,
+                "thumbnail": row.thumbnail,
+                "likes_count": row.likes_count or 0,
+                "courses": row.courses if include_body else None,
+                "uid": row.uid,
+                "tags": row.tags or [],
+                "user": {
+                    "email": row.email,
+                    "first_name": row.first_name,
+                    "last_name": row.last_name,
+                    "role": row.role
+                } if row.email is not None else None,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at
             }
             courses_data.append(course_data)
 
-        return courses_data 
+        return {"courses": courses_data, "next_cursor": next_cursor}
+
+    def filter_courses(self, statement, cursor: str = None, limit: Optional[int] = 20, type: CourseType = None, author: uuid.UUID = None, tags: List[int] = None, tag_match: TagMatch = TagMatch.ANY):
+        """Applies the course list's order, filters and cursor to statement, fetching one row past limit to tell whether a next page exists"""
+        statement = statement.order_by(Course.created_at, Course.uid)
+        if limit is not None:
+            statement = statement.limit(limit + 1)
+
+        if type is not None:
+            statement = statement.where(Course.type == type.value)
+        if author is not None:
+            statement = statement.where(Course.user_uid == author)
+        if tags:
+            tagged = select(CourseTag.course_uid).where(CourseTag.tag_id.in_(tags))
+            if tag_match == TagMatch.ALL:
+                tagged = tagged.group_by(CourseTag.course_uid).having(func.count() == len(set(tags)))
+            statement = statement.where(Course.uid.in_(tagged))
+        if cursor is not None:
+            try:
+                created_at, uid = decode_cursor(cursor)
+                after = (datetime.fromisoformat(created_at), uuid.UUID(uid))
+            except ValueError:
+                raise InvalidCursor()
+            statement = statement.where(tuple_(Course.created_at, Course.uid) > after)
+        return statement
+
+    async def get_courses_version(self, session: AsyncSession, cursor: str = None, limit: Optional[int] = 20, type: CourseType = None, author: uuid.UUID = None, tags: List[int] = None, tag_match: TagMatch = TagMatch.ANY):
+        """The uid, updated_at and likes_count of every course on the page and its author's updated_at, for an ETag; read from the same index as the page itself"""
+        statement = (
+            select(Course.uid, Course.updated_at, Course.likes_count, User.updated_at, *tags_version())
+            .outerjoin(User, User.uid == Course.user_uid)
+        )
+        statement = self.filter_courses(statement, cursor, limit, type, author, tags, tag_match)
+
+        result = await session.exec(statement)
+        return [tuple(row) for row in result.all()]
+
+    async def get_course_version(self, course_uid: str, session: AsyncSession):
+        """The course's updated_at and likes_count, its author's updated_at and the tags' version, for an ETag"""
+        statement = (
+            select(Course.updated_at, Course.likes_count, User.updated_at, *tags_version())
+            .outerjoin(User, User.uid == Course.user_uid)
+            .where(Course.uid == course_uid)
+        )
+        result = await session.exec(statement)
+        row = result.first()
+        if row is None:
+            raise CourseNotFound()
+        return tuple(row)
+
+    async def search_courses(self, session: AsyncSession, q: str, cursor: str = None, limit: int = 20):
+        """Full-text search over the title, description and text of the courses body, best match first.
+
+        On Postgres the query goes through websearch_to_tsquery against the
+        GIN-indexed search_vector, ranked with ts_rank and highlighted with
+        ts_headline for the page's rows only. Other databases use the
+        pure-Python engine in app/search.py. Both page by (rank, uid)
+        descending.
+        """
+        after = None
+        if cursor is not None:
+            try:
+                last_rank, last_uid = decode_cursor(cursor)
+                after = (float(last_rank), uuid.UUID(last_uid))
+            except ValueError:
+                raise InvalidCursor()
+
+        columns = [
+            Course.uid, Course.title, Course.type, Course.thumbnail, Course.description, Course.likes_count,
+            Course.created_at, Course.updated_at,
+        ]
+        if session.bind.dialect.name == "postgresql":
+            query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+            rank = func.ts_rank(search_vector, query)
+            statement = (
+                select(*columns, Course.courses, rank.label("rank"))
+                .where(search_vector.op("@@")(query))
+                .order_by(rank.desc(), Course.uid.desc())
+                .limit(limit + 1)
+            )
+            if after is not None:
+                statement = statement.where(tuple_(rank, Course.uid) < tuple_(literal(after[0], REAL), literal(after[1])))
+
+            page = statement.subquery()
+            document = func.concat_ws(" ", page.c.title, page.c.description, course_body_text(page.c.courses))
+            statement = (
+                select(*[column for column in page.c if column.name != "courses"], func.ts_headline(SEARCH_CONFIG, document, query, SEARCH_HEADLINE_OPTIONS).label("headline"))
+                .order_by(page.c.rank.desc(), page.c.uid.desc())
+            )
+            result = await session.exec(statement)
+            results = [(row.rank, row.headline, row) for row in result.all()]
+        else:
+            result = await session.exec(select(*columns, Course.courses))
+            results = python_search(result.all(), q, limit + 1, after)
+
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_cursor(results[-1][0], results[-1][2].uid)
+
+        return {
+            "results": [{
+                "uid": row.uid,
+                "title": row.title,
+                "type": row.type,
+                "thumbnail": row.thumbnail,
+                "description": row.description,
+                "likes_count": row.likes_count or 0,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                "rank": rank,
+                "headline": headline
+            } for rank, headline, row in results],
+            "next_cursor": next_cursor
+        }
+
+    async def get_all_user_courses(self, user_uid: str, session: AsyncSession):
+        page = await self.get_all_courses(session, limit=None, author=user_uid, include_body=True)
+        return page["courses"]
 
     async def create_course(self, user_uid: str, course_data: CourseCreateModel, session: AsyncSession):
         course_data_dict = course_data.model_dump()
@@ -435,6 +715,7 @@ class CourseService:
         await CourseTagService().add_tags_to_course(new_course.uid, tags, session)
 
         await session.commit()
+        await response_cache.invalidate(COURSES)
 
         return new_course
 
@@ -448,6 +729,7 @@ class CourseService:
             for k, v in updated_dict.items():
                 setattr(course_to_update, k, v)
             await session.commit()
+            await response_cache.invalidate(COURSES, course_namespace(course_uid))
             return course_to_update
         raise CourseNotFound()
 
@@ -456,6 +738,7 @@ class CourseService:
         if course_to_delete:
             await session.delete(course_to_delete)
             await session.commit()
+            await response_cache.invalidate(COURSES, course_namespace(course_uid))
 
             return {"message": "Course Deleted"}
         else:
@@ -481,6 +764,10 @@ class TagService:
         else:
             return result.first()
 
+    async def get_tags_version(self, session: AsyncSession):
+        result = await session.exec(select(*tags_version()))
+        return tuple(result.one())
+
     async def get_all_tags(self, session: AsyncSession):
         statement = select(Tag)
         result = await session.exec(statement)
@@ -522,6 +809,8 @@ class TagService:
         
         setattr(tag_to_update, "name", tag_name)
         await session.commit()
+        # Tag names are embedded in every course response
+        await response_cache.invalidate(CATALOGUE)
 
         return tag_to_update
     
@@ -533,6 +822,7 @@ class TagService:
         
         await session.delete(tag_check)
         await session.commit()
+        await response_cache.invalidate(CATALOGUE)
 
 class CourseTagService:
     async def get_all_course_tags(self, course_uid: str, session: AsyncSession):
@@ -552,22 +842,9 @@ class CourseTagService:
             raise TagNotFound()
         return tags
 
-    async def get_all_tag_courses(self, tag_id: int, session: AsyncSession):
-        """This gets all the courses that has a particular tag"""
-        all_courses = await CourseService().get_all_courses(session)
-
-        courses = []
-
-        for course in all_courses:
-            if course['tags']:
-                for tag in course['tags']:
-                    if tag.id == tag_id:
-                        courses.append(course)
-
-
-        if courses is None:
-            raise CourseNotFound()
-        return courses
+    async def get_all_tag_courses(self, tag_ids: List[int], session: AsyncSession, cursor: str = None, limit: int = 20, tag_match: TagMatch = TagMatch.ANY, include_body: bool = False):
+        """This gets one page of the courses that have any, or all, of the given tags"""
+        return await CourseService().get_all_courses(session, cursor=cursor, limit=limit, tags=tag_ids, tag_match=tag_match, include_body=include_body)
 
     async def create_course_tag(self, tag_id: int, course_uid: str, session: AsyncSession):
         tag_check = await TagService().get_tag_by_id(tag_id, session)
@@ -581,7 +858,10 @@ class CourseTagService:
         )
 
         session.add(new_course_tag)
+        # A course's tags are part of it, so its ETag has to move
+        await session.exec(update(Course).where(Course.uid == course_uid).values(updated_at=datetime.now()))
         await session.commit()
+        await response_cache.invalidate(COURSES, course_namespace(course_uid))
 
         return new_course_tag
 
@@ -603,6 +883,9 @@ class CourseTagService:
 
             session.add(new_course_tag)
             await session.commit()
+        await session.exec(update(Course).where(Course.uid == course_uid).values(updated_at=datetime.now()))
+        await session.commit()
+        await response_cache.invalidate(COURSES, course_namespace(course_uid))
 
         return "Course Tags Added"
     
@@ -621,21 +904,57 @@ class LikeService:
     async def like_a_post(self, user_uid, course_uid, session: AsyncSession):
         like_check = await self.check_existing_like(user_uid, course_uid, session)
         if like_check is False:
-            new_like = Like(
-                user_uid=user_uid,
-                course_uid=course_uid
+            # The counter moves in the same transaction as the like row, so a failed insert undoes it.
+            # Likes are not edits to the course, so updated_at is kept as it is
+            result = await session.exec(
+                update(Course).where(Course.uid == course_uid).values(likes_count=func.coalesce(Course.likes_count, 0) + 1, updated_at=Course.updated_at)
             )
+            if result.rowcount == 0:
+                await session.rollback()
+                raise CourseNotFound()
 
-            session.add(new_like)
-            await session.commit()
+            session.add(Like(
+                user_uid=user_uid,
+                course_uid=course_uid
+            ))
+            try:
+                await session.commit()
+            except IntegrityError:
+                # A concurrent request liked it first
+                await session.rollback()
+                return 'Already Liked'
+            await response_cache.invalidate(COURSES, course_namespace(course_uid))
             return 'liked'
         return 'Already Liked'
 
     async def unlike_a_post(self, user_uid, course_uid, session: AsyncSession):
-        like_check = await self.get_like(user_uid, course_uid, session)
-        if like_check:
-            await session.delete(like_check)
+        result = await session.exec(delete(Like).where((Like.user_uid == user_uid) & (Like.course_uid == course_uid)))
+        if result.rowcount:
+            await session.exec(
+                update(Course).where(Course.uid == course_uid).values(likes_count=func.coalesce(Course.likes_count, 1) - 1, updated_at=Course.updated_at)
+            )
             await session.commit()
+            await response_cache.invalidate(COURSES, course_namespace(course_uid))
             return 'unliked'
      
-        return 'not liked'
\ No newline at end of file
+        return 'not liked'
+
+    async def reconcile_likes_count(self, session: AsyncSession) -> int:
+        """Recomputes likes_count from the likes table wherever it has drifted, returning the number of courses fixed"""
+        actual = select(func.count()).select_from(Like).where(Like.course_uid == Course.uid).scalar_subquery()
+        result = await session.exec(
+            update(Course).where(Course.likes_count.is_distinct_from(actual)).values(likes_count=actual, updated_at=Course.updated_at)
+        )
+        await session.commit()
+        if result.rowcount:
+            await response_cache.invalidate(CATALOGUE)
+        return result.rowcount
+
+    async def reconcile_likes_count_periodically(self):
+        while True:
+            await asyncio.sleep(settings.LIKES_RECONCILE_SECONDS)
+            try:
+                async with Session() as session:
+                    await self.reconcile_likes_count(session)
+            except Exception as e:
+                logging.exception(e)
@@ -1,7 +1,15 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
+import base64
+import hashlib
+import json
+import os
 from datetime import timedelta, datetime
 import jwt
 from .config import settings
+from .cache import LRUCache
 import uuid
 import logging
 from itsdangerous import URLSafeTimedSerializer
@@ -10,17 +18,36 @@ import string
 
 
 passwd_context = CryptContext(
-    schemes=['bcrypt']
+    schemes=['bcrypt'],
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so a few threads hash in parallel while the event loop keeps serving requests
+passwd_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 2) - 1),
+    thread_name_prefix='passwd'
 )
 
 ACCESS_TOKEN_EXPIRE = 3600
 
+# Claims of recently verified tokens, keyed by the sha256 of the token
+verified_tokens = LRUCache(settings.TOKEN_CACHE_SIZE)
+
 def generate_passwd_hash(password:str) -> str:
     return passwd_context.hash(password)
 
 def verify_passwd_hash(password:str, hashed_password:str) -> bool:
     return passwd_context.verify(password, hashed_password)
 
+async def hash_passwd(password:str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(passwd_executor, generate_passwd_hash, password)
+
+async def verify_and_update_passwd(password:str, hashed_password:str) -> Tuple[bool, Optional[str]]:
+    """Verifies password off the event loop, returning a new hash as well when the stored one uses another cost"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(passwd_executor, passwd_context.verify_and_update, password, hashed_password)
+
 def create_access_token(user_data:dict, expiry:timedelta = None, refresh:bool = False):
     payload = {}
 
@@ -51,6 +78,32 @@ def decode_token(token:str):
         logging.exception(e)
         return None
 
+def verify_token(token:str):
+    """decode_token, remembering the claims of a verified token until it expires"""
+    key = hashlib.sha256(token.encode()).digest()
+    token_data = verified_tokens.get(key)
+
+    if token_data is None:
+        token_data = decode_token(token)
+        if token_data is not None:
+            verified_tokens.set(key, token_data, expires_at=token_data.get('exp'))
+
+    return token_data
+
+def encode_cursor(*values) -> str:
+    """Packs the sort key of the last row of a page into an opaque, url-safe cursor"""
+    return base64.urlsafe_b64encode(json.dumps([str(value) for value in values]).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> list:
+    """Returns the values packed by encode_cursor, raising ValueError for anything else"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValueError(cursor) from e
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise ValueError(cursor)
+    return values
+
 def create_safe_url(user_uid: str, email: str) -> str:
     signage = {
         'user_uid': user_uid,
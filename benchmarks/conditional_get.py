@@ -0,0 +1,127 @@
+"""Cost of polling the course routes with and without If-None-Match.
+
+Polls a course, its terms, a full list page and a tag page REPEATS times
+each, once as a plain GET and once revalidating with the ETag of the first
+response, and reports latency, response bytes and queries per request.
+The response cache is switched off, so the plain polls load and serialize
+the course bodies every time while the 304s only run the version query.
+
+Point DATABASE_URL at an empty, migrated database (`alembic upgrade head`):
+
+    python -m benchmarks.conditional_get
+"""
+import asyncio
+import contextlib
+import io
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import event, insert
+
+from app.db.main import engine
+from app.main import app
+from app.models import User, Course, CourseTag, Tag
+from app.service import response_cache
+from app.utils import create_access_token
+
+COURSES = 1000
+TAGS = 20
+REPEATS = 200
+
+
+async def seed():
+    now = datetime.now()
+    user = {
+        'uid': uuid.uuid4(),
+        'first_name': 'First',
+        'last_name': 'Last',
+        'email': 'poller@example.com',
+        'password': 'x',
+        'role': 'user',
+        'is_verified': True,
+        'is_premium': False,
+        'created_at': now,
+        'updated_at': now,
+    }
+    courses = [{
+        'uid': uuid.uuid4(),
+        'title': f"Course {i}",
+        'description': 'A short description of the course.',
+        'type': 'article',
+        'courses': {'sections': [{'heading': f"Part {n}", 'body': 'The court held that the contract was void. ' * 40} for n in range(5)]},
+        'created_at': now + timedelta(seconds=i),
+        'updated_at': now,
+        'user_uid': user['uid'],
+    } for i in range(COURSES)]
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [user])
+        await conn.execute(insert(Course), courses)
+        await conn.execute(insert(Tag), [{'id': i, 'name': f"tag{i}"} for i in range(1, TAGS + 1)])
+        await conn.execute(insert(CourseTag), [
+            {'course_uid': course['uid'], 'tag_id': tag_id}
+            for course in courses
+            for tag_id in random.sample(range(1, TAGS + 1), 3)
+        ])
+    return user, str(courses[0]['uid'])
+
+
+async def main():
+    user, course_uid = await seed()
+    token = create_access_token(user_data={'email': user['email'], 'user_uid': str(user['uid']), 'role': user['role']})
+    headers = {'Authorization': f"Bearer {token}"}
+    routes = [
+        ('course', f"/api/v1/course/get/{course_uid}"),
+        ('course terms', f"/api/v1/course/get/{course_uid}/terms"),
+        ('list, with body', "/api/v1/course/get/all?limit=100&include_body=true"),
+        ('tag page', "/api/v1/coursetag/courses/1/all?limit=100"),
+    ]
+
+    queries = 0
+
+    def count_query(*args):
+        nonlocal queries
+        queries += 1
+
+    response_cache.backend = None
+    event.listen(engine.sync_engine, 'before_cursor_execute', count_query)
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    # The logging middleware prints a line per request
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            for name, route in routes:
+                etag = (await client.get(route, headers=headers)).headers['etag']
+                for mode, extra in [('200', {}), ('304', {'If-None-Match': etag})]:
+                    latencies, size = [], 0
+                    queries = 0
+                    for _ in range(REPEATS):
+                        start = time.perf_counter()
+                        response = await client.get(route, headers={**headers, **extra})
+                        latencies.append(time.perf_counter() - start)
+                        size += len(response.content)
+                    assert response.status_code == int(mode), (route, response.status_code)
+                    results.append((name, mode, statistics.median(latencies) * 1e3, size / REPEATS, queries / REPEATS))
+
+    event.remove(engine.sync_engine, 'before_cursor_execute', count_query)
+    await engine.dispose()
+
+    print(f"{'route':<16} {'status':>6} {'p50 ms':>8} {'bytes':>9} {'queries':>8}")
+    for name, mode, p50, size, per_request in results:
+        print(f"{name:<16} {mode:>6} {p50:8.2f} {size:9.0f} {per_request:8.1f}")
+
+    by_route = {}
+    for name, mode, p50, *_ in results:
+        by_route.setdefault(name, {})[mode] = p50
+    if any(timings['304'] >= timings['200'] for timings in by_route.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
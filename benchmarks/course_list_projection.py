@@ -0,0 +1,176 @@
+"""Queries and bytes on the wire for the course list, before and after the projection.
+
+Runs the original get_all_courses, which loaded Course objects with
+joinedload(likes, tags) and let the selectin relationships cascade, next
+to the column projection with and without the courses body, and to a
+single page. Every query goes through a small TCP proxy in front of
+Postgres that counts the bytes the server sends back.
+
+Needs Postgres. Point DATABASE_URL at an empty, migrated database
+(`alembic upgrade head`):
+
+    python -m benchmarks.course_list_projection
+"""
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import joinedload, sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.db.main import build_engine, engine
+from app.models import User, Course, CourseTag, Like, Tag
+from app.service import CourseService
+
+USERS = 500
+AUTHORS = 10
+COURSES = 2000
+LIKES = 10000
+TAGS = 200
+TAGS_PER_COURSE = 3
+
+
+class ByteCounter:
+    """TCP proxy that counts the bytes sent from the upstream server to the client"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.received = 0
+
+    async def pipe(self, reader, writer, count):
+        try:
+            while data := await reader.read(65536):
+                if count:
+                    self.received += len(data)
+                writer.write(data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle(self, client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection(self.host, self.port)
+        await asyncio.gather(
+            self.pipe(client_reader, server_writer, False),
+            self.pipe(server_reader, client_writer, True),
+            return_exceptions=True,
+        )
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[1]
+
+
+async def original_get_all_courses(session):
+    statement = select(Course).order_by(Course.created_at).options(joinedload(Course.likes)).options(joinedload(Course.tags))
+    result = await session.exec(statement)
+    courses = result.unique()
+    courses_data = []
+    for course in courses:
+        courses_data.append({
+            "title": course.title,
+            "description": course.description,
+            "thumbnail": course.thumbnail,
+            "likes_count": len(course.likes),
+            "courses": course.courses,
+            "uid": course.uid,
+            "tags": course.tags,
+            "user": course.user,
+            "created_at": course.created_at,
+            "updated_at": course.updated_at
+        })
+    return courses_data
+
+
+async def seed():
+    now = datetime.now()
+    users = [{
+        'uid': uuid.uuid4(),
+        'first_name': 'First',
+        'last_name': 'Last',
+        'email': f"user{i}@example.com",
+        'password': 'x',
+        'role': 'editor' if i < AUTHORS else 'user',
+        'is_verified': True,
+        'is_premium': False,
+        'created_at': now,
+        'updated_at': now,
+    } for i in range(USERS)]
+    courses = [{
+        'uid': uuid.uuid4(),
+        'title': f"Course {i}",
+        'description': 'A short description of the course.',
+        'type': 'article',
+        'courses': {'sections': [{'heading': f"Part {n}", 'body': 'Lorem ipsum dolor sit amet. ' * 40} for n in range(5)]},
+        'created_at': now + timedelta(seconds=i),
+        'updated_at': now,
+        'user_uid': users[i % AUTHORS]['uid'],
+    } for i in range(COURSES)]
+    likes = {(random.choice(users)['uid'], random.choice(courses)['uid']) for _ in range(LIKES)}
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), users)
+        await conn.execute(insert(Course), courses)
+        await conn.execute(insert(Like), [{'user_uid': u, 'course_uid': c} for u, c in likes])
+        await conn.execute(insert(Tag), [{'id': i, 'name': f"tag{i}"} for i in range(1, TAGS + 1)])
+        await conn.execute(insert(CourseTag), [
+            {'course_uid': course['uid'], 'tag_id': tag_id}
+            for course in courses
+            for tag_id in random.sample(range(1, TAGS + 1), TAGS_PER_COURSE)
+        ])
+        await conn.exec_driver_sql("ANALYZE")
+    await engine.dispose()
+
+
+async def main():
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() != 'postgresql':
+        sys.exit('This benchmark counts Postgres wire bytes; point DATABASE_URL at Postgres')
+
+    await seed()
+
+    counter = ByteCounter(url.host or 'localhost', url.port or 5432)
+    port = await counter.start()
+    proxied = build_engine(url.set(host='127.0.0.1', port=port).render_as_string(hide_password=False), 'benchmark')
+    Session = sessionmaker(bind=proxied, class_=AsyncSession, expire_on_commit=False)
+
+    queries = 0
+
+    def count_query(*args):
+        nonlocal queries
+        queries += 1
+
+    event.listen(proxied.sync_engine, 'before_cursor_execute', count_query)
+
+    service = CourseService()
+    variants = [
+        ('original get_all_courses', original_get_all_courses),
+        ('projection, with body', lambda s: service.get_all_courses(s, limit=None, include_body=True)),
+        ('projection, no body', lambda s: service.get_all_courses(s, limit=None)),
+        ('projection, page of 20', lambda s: service.get_all_courses(s, limit=20)),
+    ]
+
+    print(f"{'':<26} {'queries':>8} {'bytes':>12} {'ms':>9} {'courses':>8}")
+    for name, call in variants:
+        async with Session() as session:
+            await session.exec(select(1))
+            queries, counter.received = 0, 0
+            start = time.perf_counter()
+            result = await call(session)
+            elapsed = time.perf_counter() - start
+        rows = len(result) if isinstance(result, list) else len(result['courses'])
+        print(f"{name:<26} {queries:>8} {counter.received:>12,} {elapsed * 1e3:9.1f} {rows:>8}")
+
+    await proxied.dispose()
+    counter.server.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
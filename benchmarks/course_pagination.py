@@ -0,0 +1,133 @@
+"""Latency and memory of the keyset-paginated course list as the catalogue grows.
+
+Grows the courses table in steps up to 100k rows, and at each size fetches
+pages at several depths, with and without the type, author and tag
+filters. Reports the median latency and the tracemalloc peak per page; both
+should stay flat across catalogue sizes and cursor depths.
+
+Point DATABASE_URL at an empty, migrated database (`alembic upgrade head`):
+the script inserts 100k+ rows and does not clean up.
+
+    python -m benchmarks.course_pagination
+"""
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlmodel import select
+
+from app.db.main import engine, Session
+from app.models import User, Course, CourseTag, Like, Tag, CourseType
+from app.schemas import CoursePageResponseModel
+from app.service import CourseService
+from app.utils import encode_cursor
+
+SIZES = [10000, 50000, 100000]
+AUTHORS = 50
+TAGS = 200
+LIKES_PER_COURSE = 3
+LIMIT = 20
+REPEATS = 20
+
+
+async def seed(authors, start, stop, now):
+    courses = [{
+        'uid': uuid.uuid4(),
+        'title': f"Course {i}",
+        'description': 'A short description of the course.',
+        'type': random.choice([CourseType.VIDEO.value, CourseType.ARTICLE.value]),
+        'courses': {'sections': [{'heading': 'Introduction', 'body': 'Lorem ipsum ' * 20}]},
+        'created_at': now + timedelta(seconds=i),
+        'updated_at': now,
+        'user_uid': random.choice(authors),
+    } for i in range(start, stop)]
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(Course), courses)
+        await conn.execute(insert(CourseTag), [
+            {'course_uid': course['uid'], 'tag_id': tag_id}
+            for course in courses
+            for tag_id in random.sample(range(1, TAGS + 1), 3)
+        ])
+        await conn.execute(insert(Like), [
+            {'user_uid': user_uid, 'course_uid': course['uid']}
+            for course in courses
+            for user_uid in random.sample(authors, LIKES_PER_COURSE)
+        ])
+        for table in ('courses', 'course_tags', 'likes'):
+            await conn.exec_driver_sql(f"ANALYZE {table}")
+
+
+async def fetch(cursor, filters):
+    async with Session() as session:
+        page = await CourseService().get_all_courses(session, cursor=cursor, limit=LIMIT, **filters)
+        CoursePageResponseModel.model_validate(page, from_attributes=True)
+    return page
+
+
+async def measure(cursor, **filters):
+    latencies = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        page = await fetch(cursor, filters)
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    await fetch(cursor, filters)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(latencies) * 1e3, peak / 1024, len(page['courses'])
+
+
+async def main():
+    now = datetime.now()
+    users = [{
+        'uid': uuid.uuid4(),
+        'first_name': 'First',
+        'last_name': 'Last',
+        'email': f"author{i}@example.com",
+        'password': 'x',
+        'role': 'editor',
+        'is_verified': True,
+        'is_premium': False,
+        'created_at': now,
+        'updated_at': now,
+    } for i in range(AUTHORS)]
+    authors = [user['uid'] for user in users]
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), users)
+        await conn.execute(insert(Tag), [{'id': i, 'name': f"tag{i}"} for i in range(1, TAGS + 1)])
+
+    print(f"{'courses':>8} {'query':<22} {'p50 ms':>8} {'peak KiB':>9} {'rows':>5}")
+    seeded = 0
+    for size in SIZES:
+        await seed(authors, seeded, size, now)
+        seeded = size
+
+        async with Session() as session:
+            middle = (await session.exec(select(Course.created_at, Course.uid).order_by(Course.created_at, Course.uid).offset(size // 2).limit(1))).one()
+            last = (await session.exec(select(Course.created_at, Course.uid).order_by(Course.created_at, Course.uid).offset(size - LIMIT - 1).limit(1))).one()
+
+        queries = [
+            ('first page', None, {}),
+            ('middle page', encode_cursor(middle[0].isoformat(), middle[1]), {}),
+            ('last page', encode_cursor(last[0].isoformat(), last[1]), {}),
+            ('type, middle', encode_cursor(middle[0].isoformat(), middle[1]), {'type': CourseType.VIDEO}),
+            ('author, middle', encode_cursor(middle[0].isoformat(), middle[1]), {'author': authors[0]}),
+            ('tag, middle', encode_cursor(middle[0].isoformat(), middle[1]), {'tags': [1]}),
+        ]
+        for name, cursor, filters in queries:
+            p50, peak, rows = await measure(cursor, **filters)
+            print(f"{size:>8} {name:<22} {p50:8.2f} {peak:9.0f} {rows:>5}")
+
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,194 @@
+"""Course search latency on a generated 50k-course corpus.
+
+Generates COURSES courses whose titles, descriptions and section bodies
+draw from a Zipf-distributed legal vocabulary, then times a page of results
+for common, rare, combined, alternative, phrase and negated queries, plus
+a page five cursors deep. The vocabulary has a long tail of generated
+words, so rare terms match a few hundred courses while common ones match
+most of the corpus. On Postgres it reports how each query reads courses,
+requires the GIN index on courses.search_vector for the selective ones,
+and runs the same queries through the pure-Python engine once for
+comparison.
+
+Point DATABASE_URL at an empty, migrated database (`alembic upgrade head`):
+the script inserts 50k rows and does not clean up.
+
+    python -m benchmarks.course_search
+"""
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert
+from sqlmodel import select
+
+from app.db.main import engine, Session
+from app.models import User, Course
+from app.search import search as python_search
+from app.service import CourseService
+
+COURSES = 50000
+BATCH = 5000
+LIMIT = 20
+REPEATS = 20
+VOCABULARY = """
+contract tort negligence liability court appeal statute damages plaintiff defendant evidence hearsay
+jurisdiction injunction trust equity property lease tenant landlord consideration offer acceptance breach
+remedy restitution estoppel fiduciary beneficiary trustee mortgage easement covenant nuisance trespass
+defamation privacy employment dismissal discrimination constitution amendment judiciary legislature
+precedent ratio obiter tribunal arbitration mediation settlement indemnity warranty guarantee insurance
+company director shareholder insolvency liquidation receivership merger acquisition competition antitrust
+copyright patent trademark licence royalty infringement criminal prosecution sentencing bail custody
+appeal verdict jury witness testimony affidavit subpoena discovery pleading motion summons judgment
+""".split()
+# Moved to the far end of the tail
+RARE = ['receivership', 'estoppel', 'subpoena', 'antitrust']
+TAIL = 20000
+QUERIES = [
+    # (name, query, must use the index)
+    ('common term', 'contract', False),
+    ('rare term', 'receivership', True),
+    ('two rare', 'estoppel subpoena', True),
+    ('two terms', 'negligence damages', False),
+    ('either rare', 'estoppel or antitrust', True),
+    ('phrase', '"breach of contract"', False),
+    ('negation', 'receivership -mortgage', True),
+]
+
+
+def vocabulary():
+    words = [word for word in VOCABULARY if word not in RARE]
+    syllables = ['ka', 'lo', 'mi', 'ren', 'tos', 'vel', 'dri', 'pan', 'sul', 'gor', 'bex', 'nia']
+    filler = {''.join(random.choices(syllables, k=random.randint(2, 4))) for _ in range(TAIL * 2)} - set(VOCABULARY)
+    words += sorted(filler)[:TAIL]
+    for position, word in zip(range(len(words) // 4, len(words), len(words) // 4), RARE):
+        words.insert(position, word)
+    return words, list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+
+
+def sentence(words):
+    return ' '.join(random.choices(WORDS, cum_weights=WEIGHTS, k=words))
+
+
+async def seed():
+    now = datetime.now()
+    author = {
+        'uid': uuid.uuid4(),
+        'first_name': 'First',
+        'last_name': 'Last',
+        'email': 'author@example.com',
+        'password': 'x',
+        'role': 'editor',
+        'is_verified': True,
+        'is_premium': False,
+        'created_at': now,
+        'updated_at': now,
+    }
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [author])
+
+    for start in range(0, COURSES, BATCH):
+        courses = [{
+            'uid': uuid.uuid4(),
+            'title': sentence(4).title(),
+            'description': sentence(20),
+            'type': 'article',
+            'courses': {'sections': [{'heading': sentence(3), 'body': sentence(40)} for _ in range(3)]},
+            'created_at': now + timedelta(seconds=i),
+            'updated_at': now,
+            'user_uid': author['uid'],
+        } for i in range(start, start + BATCH)]
+        async with engine.begin() as conn:
+            await conn.execute(insert(Course), courses)
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE courses")
+
+
+def scans(plan):
+    yield plan['Node Type'], plan.get('Index Name')
+    for child in plan.get('Plans', ()):
+        yield from scans(child)
+
+
+async def timed(q, cursor=None):
+    latencies = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        async with Session() as session:
+            page = await CourseService().search_courses(session, q, cursor=cursor, limit=LIMIT)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1e3, page
+
+
+async def main():
+    global WORDS, WEIGHTS
+    random.seed(7)
+    WORDS, WEIGHTS = vocabulary()
+    start = time.perf_counter()
+    await seed()
+    print(f"seeded {COURSES} courses in {time.perf_counter() - start:.0f}s")
+
+    postgres = engine.dialect.name == 'postgresql'
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    rows = []
+    if postgres:
+        async with Session() as session:
+            rows = (await session.exec(select(Course.uid, Course.title, Course.description, Course.courses))).all()
+
+    print(f"{'query':<14} {'p50 ms':>8} {'results':>8} {'python ms':>10}  courses read by")
+    failures = 0
+    for name, q, needs_index in QUERIES + [('5 pages deep', 'contract', False)]:
+        cursor = None
+        if name == '5 pages deep':
+            for _ in range(5):
+                async with Session() as session:
+                    cursor = (await CourseService().search_courses(session, q, cursor=cursor, limit=LIMIT))['next_cursor']
+
+        p50, page = await timed(q, cursor)
+
+        access = '-'
+        python_ms = '-'
+        if postgres:
+            statements.clear()
+            event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+            async with Session() as session:
+                await CourseService().search_courses(session, q, cursor=cursor, limit=LIMIT)
+            event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+            async with engine.connect() as conn:
+                statement, parameters = statements[-1]
+                plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+            nodes = list(scans(plan[0]['Plan']))
+            if any(index_name == 'ix_courses_search_vector' for _, index_name in nodes):
+                access = 'ix_courses_search_vector'
+            else:
+                access = 'Seq Scan' if any(node == 'Seq Scan' for node, _ in nodes) else 'other'
+                if needs_index:
+                    access += ' (NEEDS INDEX)'
+                    failures += 1
+
+            if cursor is None:
+                start = time.perf_counter()
+                python_search(rows, q, LIMIT + 1)
+                python_ms = f"{(time.perf_counter() - start) * 1e3:.0f}"
+
+        print(f"{name:<14} {p50:8.2f} {len(page['results']):>8} {python_ms:>10}  {access}")
+
+    await engine.dispose()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+"""N single definition lookups against one POST /dictionary/batch call.
+
+Requests go through the ASGI app in-process, so the numbers only cover
+routing, validation and serialization. Pass a round trip time in ms to add
+the network latency a real client pays per request.
+
+    python -m benchmarks.dictionary_batch [terms] [rtt_ms]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.routers import dictionary
+
+
+async def main(count: int, rtt: float):
+  app = FastAPI()
+  app.include_router(dictionary.router)
+  terms = dictionary.dictionary.get_terms('A', limit=count)
+
+  async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+    start = time.perf_counter()
+    for term in terms:
+      await asyncio.sleep(rtt)
+      response = await client.get('/dictionary/', params={'q': term})
+      response.raise_for_status()
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.sleep(rtt)
+    response = await client.post('/dictionary/batch', json={'terms': terms})
+    response.raise_for_status()
+    batch = time.perf_counter() - start
+
+  print(f"{len(terms)} single lookups: {single * 1000:8.1f} ms")
+  print(f"1 batch lookup:     {batch * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+  rtt = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+  asyncio.run(main(count, rtt))
@@ -0,0 +1,40 @@
+"""Fuzzy term lookup through the trigram index against a brute-force edit distance scan.
+
+    python -m benchmarks.dictionary_fuzzy
+"""
+import time
+from heapq import nlargest
+
+from app.dictionary.store import open_dictionary
+from app.dictionary.fuzzy import FuzzyIndex, levenshtein
+
+QUERIES = ['MORTGAG', 'A NATIVITATE', 'A VINCULO MATRIMONII', 'TRESPAS', 'HABEAS CORPSU', 'NEGLIGENSE', 'CONTRACT', 'ESTOPEL']
+
+
+def similarity(q: str, term: str) -> float:
+  return 1 - levenshtein(q, term) / max(len(q), len(term))
+
+
+def brute_force(terms, q: str, limit: int = 5):
+  """Scores every term with the same similarity the index reports."""
+  return nlargest(limit, terms, key=lambda term: similarity(q, term))
+
+
+def timed(fn, *args):
+  start = time.perf_counter()
+  result = fn(*args)
+  return result, (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+  terms = open_dictionary().terms
+  index, build_ms = timed(FuzzyIndex, terms)
+  print(f"index build: {build_ms:.1f} ms over {len(terms)} terms\n")
+
+  for q in QUERIES:
+    fuzzy, fuzzy_ms = timed(index.search, q)
+    brute, brute_ms = timed(brute_force, terms, q)
+    agree = len({term for term, _ in fuzzy} & set(brute))
+    # Terms tied on score may differ when one shares no trigram with the query
+    same_scores = [score for _, score in fuzzy] == [round(similarity(q, term), 3) for term in brute]
+    print(f"{q:<22} index {fuzzy_ms:6.2f} ms   brute force {brute_ms:7.1f} ms   top-5 overlap {agree}/5   same scores {same_scores}")
@@ -0,0 +1,50 @@
+"""Startup time and RSS of the json dictionary loader against the compiled data.bin.
+
+Each loader runs in a fresh interpreter so import caches and freed memory from
+one run do not leak into the next.
+
+    python -m benchmarks.dictionary_load
+"""
+import subprocess
+import sys
+
+JSON_LOADER = """
+import json
+with open('app/dictionary/data.json') as f:
+  dict = json.load(f)
+law_dict = {}
+for id in dict['term']:
+  law_dict[dict['term'][id]] = dict['definition'][id]
+"""
+
+BINARY_LOADER = """
+from app.dictionary.store import DictionaryStore
+law_dict = DictionaryStore.open()
+"""
+
+HARNESS = """
+import resource, time
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+{loader}
+elapsed = time.perf_counter() - start
+rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, rss_after - rss_before, rss_after)
+"""
+
+
+def measure(loader: str, runs: int = 5):
+  timings, deltas, totals = [], [], []
+  for _ in range(runs):
+    out = subprocess.run([sys.executable, '-c', HARNESS.format(loader=loader)], capture_output=True, text=True, check=True)
+    elapsed, delta, total = out.stdout.split()
+    timings.append(float(elapsed))
+    deltas.append(int(delta))
+    totals.append(int(total))
+  return min(timings), min(deltas), min(totals)
+
+
+if __name__ == '__main__':
+  for name, loader in (('json', JSON_LOADER), ('binary', BINARY_LOADER)):
+    elapsed, delta, total = measure(loader)
+    print(f"{name:>8}: load {elapsed * 1000:7.1f} ms   rss +{delta / 1024:6.1f} MiB   peak {total / 1024:6.1f} MiB")
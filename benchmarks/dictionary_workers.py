@@ -0,0 +1,73 @@
+"""Per-worker memory of the dictionary with and without pre-fork loading (Linux only).
+
+Forks a handful of workers the way gunicorn does. In "per-worker" mode
+every worker loads the dictionary itself, as uvicorn --workers does; in
+"pre-fork" mode the parent calls preload_dictionary() first. Each worker
+runs a few queries and reports its RSS, PSS and private memory from
+/proc/self/smaps_rollup.
+
+    python -m benchmarks.dictionary_workers [workers]
+"""
+import os
+import subprocess
+import sys
+
+QUERIES = ['MORTGAGE', 'TRESPASS', 'ESTOPPEL', 'CONTRACT']
+
+
+def smaps():
+  usage = {}
+  with open('/proc/self/smaps_rollup') as f:
+    for line in f:
+      key, _, value = line.partition(':')
+      if value.strip().endswith('kB'):
+        usage[key] = int(value.split()[0])
+  return usage['Rss'], usage['Pss'], usage['Private_Clean'] + usage['Private_Dirty']
+
+
+def work():
+  from app.dictionary.main import DictionaryService, preload_dictionary
+
+  preload_dictionary()
+  dictionary = DictionaryService()
+  for q in QUERIES:
+    dictionary.get_terms(q)
+    dictionary.get_fuzzy_terms(q)
+    dictionary.search_definitions(q)
+    dictionary.get_related_terms(q)
+
+
+def run(mode: str, workers: int):
+  if mode == 'pre-fork':
+    from app.dictionary.main import preload_dictionary
+    preload_dictionary()
+
+  pipes = []
+  for _ in range(workers):
+    read, write = os.pipe()
+    if os.fork() == 0:
+      os.close(read)
+      work()
+      os.write(write, ' '.join(map(str, smaps())).encode())
+      os._exit(0)
+    os.close(write)
+    pipes.append(read)
+
+  # Read only once every worker has loaded, so PSS reflects the sharing between all of them
+  reports = []
+  for read in pipes:
+    reports.append([int(value) for value in os.read(read, 100).split()])
+    os.close(read)
+    os.wait()
+
+  rss, pss, private = (sum(column) / len(reports) / 1024 for column in zip(*reports))
+  print(f"{mode:>10}: per worker rss {rss:6.1f} MiB   pss {pss:6.1f} MiB   private {private:6.1f} MiB")
+
+
+if __name__ == '__main__':
+  if len(sys.argv) > 2:
+    run(sys.argv[1], int(sys.argv[2]))
+  else:
+    workers = sys.argv[1] if len(sys.argv) > 1 else '4'
+    for mode in ('per-worker', 'pre-fork'):
+      subprocess.run([sys.executable, '-m', 'benchmarks.dictionary_workers', mode, workers], check=True)
@@ -0,0 +1,161 @@
+"""Checks that the service layer's lookups are answered from indexes.
+
+Seeds a scratch Postgres database, runs the service methods that filter or
+sort on the hot columns and captures every SQL statement they emit, then
+re-runs each one under EXPLAIN. The script fails if a service's own query
+reads the table it filters or sorts with a sequential scan. Tables joined
+in by joinedload, and the selectin loads that follow, are printed too
+(marked "join" and "load") but do not fail the run: they fetch whole
+relationships, and the planner may rightly prefer a hash join over them.
+
+Point DATABASE_URL at an empty, migrated database (`alembic upgrade head`):
+the script inserts tens of thousands of rows and does not clean up.
+
+    python -m benchmarks.explain_indexes
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert
+
+from app.db.main import engine, Session
+from app.models import User, Course, Like, RevokedToken, Tag, CourseTag, UserRole, TagMatch
+from app.service import UserService, EditorService, AdminService, CourseService, LikeService, TokenService, CourseTagService
+
+USERS = 20000
+EDITORS = 50
+ADMINS = 5
+COURSES = 20000
+LIKES = 100000
+TOKENS = 20000
+TAGS = 200
+TAGS_PER_COURSE = 3
+
+TABLES = {'users', 'courses', 'likes', 'revokedtoken', 'tags', 'course_tags'}
+
+
+async def seed():
+    now = datetime.now()
+    roles = [UserRole.ADMIN.value] * ADMINS + [UserRole.EDITOR.value] * EDITORS + [UserRole.USER.value] * USERS
+    users = [{
+        'uid': uuid.uuid4(),
+        'first_name': 'First',
+        'last_name': 'Last',
+        'email': f"user{i}@example.com",
+        'password': 'x',
+        'role': role,
+        'is_verified': True,
+        'is_premium': False,
+        'created_at': now - timedelta(minutes=i),
+        'updated_at': now,
+    } for i, role in enumerate(roles)]
+    authors = [user['uid'] for user in users[:ADMINS + EDITORS]]
+
+    courses = [{
+        'uid': uuid.uuid4(),
+        'title': f"Course {i}",
+        'type': 'article',
+        'courses': {},
+        'likes_count': 0,
+        'created_at': now - timedelta(minutes=i),
+        'updated_at': now,
+        'user_uid': random.choice(authors),
+    } for i in range(COURSES)]
+
+    likes = {(random.choice(users)['uid'], random.choice(courses)['uid']) for _ in range(LIKES)}
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), users)
+        await conn.execute(insert(Course), courses)
+        await conn.execute(insert(Like), [{'user_uid': u, 'course_uid': c} for u, c in likes])
+        await conn.execute(insert(RevokedToken), [{'tokenid': uuid.uuid4(), 'token_jti': str(uuid.uuid4()), 'expires_at': int(time.time()) + 3600} for _ in range(TOKENS)])
+        await conn.execute(insert(Tag), [{'id': i, 'name': f"tag{i}"} for i in range(1, TAGS + 1)])
+        await conn.execute(insert(CourseTag), [
+            {'course_uid': course['uid'], 'tag_id': tag_id}
+            for course in courses
+            for tag_id in random.sample(range(1, TAGS + 1), TAGS_PER_COURSE)
+        ])
+        for table in TABLES:
+            await conn.exec_driver_sql(f"ANALYZE {table}")
+
+    return users, courses
+
+
+def scans(plan):
+    """Yields (node type, relation, index) for every node of an EXPLAIN plan that reads a table."""
+    if 'Relation Name' in plan:
+        yield plan['Node Type'], plan['Relation Name'], plan.get('Index Name')
+    for child in plan.get('Plans', ()):
+        yield from scans(child)
+
+
+async def main():
+    users, courses = await seed()
+    user = users[-1]
+    editor = users[ADMINS]
+    course = courses[0]
+    token_jti = str(uuid.uuid4())
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    calls = [
+        ('UserService.get_all_user_by_email', 'users', lambda s: UserService().get_all_user_by_email(user['email'], s)),
+        ('UserService.get_user_by_email', 'users', lambda s: UserService().get_user_by_email(user['email'], s)),
+        ('UserService.get_user_by_uid', 'users', lambda s: UserService().get_user_by_uid(user['uid'], s)),
+        ('EditorService.get_editor_by_email', 'users', lambda s: EditorService().get_editor_by_email(editor['email'], s)),
+        ('EditorService.get_all_editors', 'users', lambda s: EditorService().get_all_editors(s)),
+        ('AdminService.get_admin_by_email', 'users', lambda s: AdminService().get_admin_by_email(users[0]['email'], s)),
+        ('AdminService.get_all_admins', 'users', lambda s: AdminService().get_all_admins(s)),
+        ('CourseService.get_all_user_courses', 'courses', lambda s: CourseService().get_all_user_courses(editor['uid'], s)),
+        ('CourseService.get_course_by_uid', 'courses', lambda s: CourseService().get_course_by_uid(course['uid'], s)),
+        ('CourseTagService.get_all_tag_courses', 'course_tags', lambda s: CourseTagService().get_all_tag_courses([1], s)),
+        ('CourseTagService.get_all_tag_courses all', 'course_tags', lambda s: CourseTagService().get_all_tag_courses([1, 2], s, tag_match=TagMatch.ALL)),
+        ('LikeService.check_existing_like', 'likes', lambda s: LikeService().check_existing_like(user['uid'], course['uid'], s)),
+        ('TokenService.get_token_from_blacklist', 'revokedtoken', lambda s: TokenService().get_token_from_blacklist(s, token_jti)),
+    ]
+
+    failures = 0
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    for name, target, call in calls:
+        statements.clear()
+        async with Session() as session:
+            await call(session)
+
+        async with engine.connect() as conn:
+            for position, (statement, parameters) in enumerate(list(statements)):
+                result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                for node, relation, index in scans(plan[0]['Plan']):
+                    if relation not in TABLES:
+                        continue
+                    if position > 0:
+                        status = 'load'
+                    elif relation != target:
+                        status = 'join'
+                    elif node == 'Seq Scan':
+                        status = 'SEQ'
+                        failures += 1
+                    else:
+                        status = 'ok'
+                    print(f"{status:<5} {name:<40} {relation:<13} {node:<18} {index or ''}")
+    event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+
+    await engine.dispose()
+    if failures:
+        print(f"\n{failures} sequential scan(s) on indexed lookups")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
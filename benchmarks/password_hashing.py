@@ -0,0 +1,118 @@
+"""Login throughput, and the latency of unrelated requests during a login storm.
+
+Fires LOGINS concurrent logins at /api/v1/user/login while a probe keeps
+requesting / and records how long each probe takes. Runs once with bcrypt
+called inline on the event loop, as the routes used to, and once through
+the password thread pool. Finally logs in a user whose hash was made with a
+lower cost and checks that the stored hash was upgraded.
+
+Point DATABASE_URL at an empty, migrated database (`alembic upgrade head`):
+
+    python -m benchmarks.password_hashing
+"""
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+from passlib.context import CryptContext
+from sqlalchemy import insert
+from sqlmodel import select
+
+from app.config import settings
+from app.db.main import engine, Session
+from app.main import app
+from app.models import User
+from app.routers import user as user_router
+from app.utils import generate_passwd_hash, passwd_context, verify_and_update_passwd
+
+LOGINS = 32
+PASSWORD = 'correct horse battery staple'
+
+
+def new_user(email, password_hash):
+    return {
+        'uid': uuid.uuid4(),
+        'first_name': 'First',
+        'last_name': 'Last',
+        'email': email,
+        'password': password_hash,
+        'role': 'user',
+        'is_verified': True,
+        'is_premium': False,
+        'created_at': datetime.now(),
+        'updated_at': datetime.now(),
+    }
+
+
+async def verify_inline(password, hashed_password):
+    return passwd_context.verify_and_update(password, hashed_password)
+
+
+async def storm(client):
+    probes = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get('/')
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    async def login():
+        response = await client.post('/api/v1/user/login', json={'email': 'storm@example.com', 'password': PASSWORD})
+        assert response.status_code == 200, response.text
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(LOGINS)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+
+    probes.sort()
+    return LOGINS / elapsed, statistics.median(probes) * 1e3, probes[int(len(probes) * 0.99)] * 1e3, len(probes)
+
+
+async def main():
+    weaker = CryptContext(schemes=['bcrypt'], bcrypt__rounds=settings.BCRYPT_ROUNDS - 2)
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [
+            new_user('storm@example.com', generate_passwd_hash(PASSWORD)),
+            new_user('rehash@example.com', weaker.hash(PASSWORD)),
+        ])
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    # The logging middleware prints a line per request
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            for name, verify in [('inline', verify_inline), ('thread pool', verify_and_update_passwd)]:
+                user_router.verify_and_update_passwd = verify
+                results.append((name, *await storm(client)))
+            user_router.verify_and_update_passwd = verify_and_update_passwd
+
+            response = await client.post('/api/v1/user/login', json={'email': 'rehash@example.com', 'password': PASSWORD})
+            assert response.status_code == 200, response.text
+
+    for name, rate, p50, p99, count in results:
+        print(f"{name:<12} {rate:6.1f} logins/s   other requests p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  ({count} probes)")
+
+    async with Session() as session:
+        stored = (await session.exec(select(User.password).where(User.email == 'rehash@example.com'))).one()
+    upgraded = stored.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    print(f"cost {settings.BCRYPT_ROUNDS - 2} hash {'rehashed' if upgraded else 'NOT rehashed'} to cost {settings.BCRYPT_ROUNDS} on login")
+
+    await engine.dispose()
+    if not upgraded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
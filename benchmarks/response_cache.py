@@ -0,0 +1,169 @@
+"""Throughput of the course catalogue routes with and without the response cache.
+
+Requests a mix of list pages, tag pages and course details from CONCURRENCY
+clients for DURATION seconds per backend: no cache, the in-process LRU, and
+Redis when REDIS_URL is set. Every 100th request likes or unlikes a course,
+which invalidates the lists and that course. Finally checks that a like is
+visible on the next read of the list and of the course.
+
+Point DATABASE_URL at an empty, migrated database (`alembic upgrade head`):
+
+    python -m benchmarks.response_cache
+"""
+import asyncio
+import contextlib
+import io
+import itertools
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import insert
+
+from app.cache import MemoryBackend, RedisBackend
+from app.config import settings
+from app.db.main import engine
+from app.main import app
+from app.models import User, Course, CourseTag, Tag
+from app.service import response_cache
+from app.utils import create_access_token
+
+COURSES = 2000
+TAGS = 50
+CONCURRENCY = 16
+DURATION = 10
+WRITE_EVERY = 100
+
+
+async def seed():
+    now = datetime.now()
+    users = [{
+        'uid': uuid.uuid4(),
+        'first_name': 'First',
+        'last_name': 'Last',
+        'email': f"reader{i}@example.com",
+        'password': 'x',
+        'role': 'user',
+        'is_verified': True,
+        'is_premium': False,
+        'created_at': now,
+        'updated_at': now,
+    } for i in range(CONCURRENCY)]
+    courses = [{
+        'uid': uuid.uuid4(),
+        'title': f"Course {i}",
+        'description': 'A short description of the course.',
+        'type': 'article',
+        'courses': {'sections': [{'heading': 'Introduction', 'body': 'Lorem ipsum ' * 50}]},
+        'created_at': now + timedelta(seconds=i),
+        'updated_at': now,
+        'user_uid': users[0]['uid'],
+    } for i in range(COURSES)]
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), users)
+        await conn.execute(insert(Course), courses)
+        await conn.execute(insert(Tag), [{'id': i, 'name': f"tag{i}"} for i in range(1, TAGS + 1)])
+        await conn.execute(insert(CourseTag), [
+            {'course_uid': course['uid'], 'tag_id': tag_id}
+            for course in courses
+            for tag_id in random.sample(range(1, TAGS + 1), 3)
+        ])
+    return users, [str(course['uid']) for course in courses]
+
+
+def headers_for(user):
+    token = create_access_token(user_data={'email': user['email'], 'user_uid': str(user['uid']), 'role': user['role']})
+    return {'Authorization': f"Bearer {token}"}
+
+
+async def run(client, users, course_uids):
+    # A small hot set, as on a catalogue front page
+    reads = [
+        *[f"/api/v1/course/get/all?limit=20&type=article"] * 4,
+        *[f"/api/v1/coursetag/courses/{tag_id}/all" for tag_id in range(1, 6)],
+        *[f"/api/v1/course/get/{uid}" for uid in course_uids[:20]],
+    ]
+    counter = itertools.count()
+    deadline = time.perf_counter() + DURATION
+
+    async def worker(user):
+        headers = headers_for(user)
+        liked = set()
+        while time.perf_counter() < deadline:
+            n = next(counter)
+            if n % WRITE_EVERY == 0:
+                uid = random.choice(course_uids[:20])
+                if uid in liked:
+                    response = await client.delete(f"/api/v1/like/{uid}", headers=headers)
+                    liked.discard(uid)
+                else:
+                    response = await client.post(f"/api/v1/like/{uid}", headers=headers)
+                    liked.add(uid)
+            else:
+                response = await client.get(random.choice(reads), headers=headers)
+            assert response.status_code < 300, response.text
+
+    await asyncio.gather(*(worker(user) for user in users))
+    return next(counter) / DURATION
+
+
+async def check_invalidation(client, users, course_uids):
+    headers = headers_for(users[0])
+    # The oldest course heads the first list page
+    uid = course_uids[0]
+    routes = [f"/api/v1/course/get/{uid}", "/api/v1/course/get/all?limit=1"]
+
+    def likes(response):
+        body = response.json()
+        return body['likes_count'] if 'likes_count' in body else body['courses'][0]['likes_count']
+
+    for route in routes:
+        await client.get(route, headers=headers)
+    before = [await client.get(route, headers=headers) for route in routes]
+    await client.post(f"/api/v1/like/{uid}", headers=headers)
+    after = [await client.get(route, headers=headers) for route in routes]
+    await client.delete(f"/api/v1/like/{uid}", headers=headers)
+
+    return all(
+        old.headers.get('x-cache') == 'HIT' and new.headers.get('x-cache') == 'MISS' and likes(new) == likes(old) + 1
+        for old, new in zip(before, after)
+    )
+
+
+async def main():
+    users, course_uids = await seed()
+
+    backends = [('none', None), ('memory', MemoryBackend(settings.RESPONSE_CACHE_SIZE))]
+    if settings.REDIS_URL:
+        backends.append(('redis', RedisBackend(settings.REDIS_URL, prefix=f"legalpadi-bench-{uuid.uuid4()}:")))
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    # The logging middleware prints a line per request
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            for name, backend in backends:
+                response_cache.backend = backend
+                response_cache.hits = response_cache.misses = response_cache.invalidations = 0
+                rate = await run(client, users, course_uids)
+                stats = response_cache.stats()
+                consistent = await check_invalidation(client, users, course_uids) if backend is not None else None
+                results.append((name, rate, stats, consistent))
+
+    print(f"{'backend':<8} {'req/s':>8} {'hits':>7} {'misses':>7} {'hit ratio':>9} {'invalidations':>13}  like visible")
+    for name, rate, stats, consistent in results:
+        ratio = f"{stats['hit_ratio']:.2f}" if stats['hit_ratio'] is not None else '-'
+        visible = '-' if consistent is None else ('yes' if consistent else 'NO')
+        print(f"{name:<8} {rate:8.0f} {stats['hits']:>7} {stats['misses']:>7} {ratio:>9} {stats['invalidations']:>13}  {visible}")
+
+    await engine.dispose()
+    if any(consistent is False for *_, consistent in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+"""Cold-start cost of the schema step in life_span for each DB_SCHEMA_CHECK mode.
+
+Every run uses a fresh engine, like a new serverless instance, against the
+database in DATABASE_URL. The database must already be migrated.
+
+    python -m benchmarks.startup_schema [runs]
+"""
+import asyncio
+import sys
+import time
+
+from app.config import settings
+from app.db import main as db
+
+MODES = ('create_all', 'version', 'none')
+
+
+async def cold_start(mode: str) -> float:
+    db.engine = db.build_engine(settings.DATABASE_URL)
+    settings.DB_SCHEMA_CHECK = mode
+
+    start = time.perf_counter()
+    await db.init_db()
+    elapsed = time.perf_counter() - start
+
+    await db.engine.dispose()
+    return elapsed
+
+
+async def main(runs: int):
+    for mode in MODES:
+        timings = sorted([await cold_start(mode) for _ in range(runs)])
+        print(f"{mode:>10}: median {timings[len(timings) // 2] * 1000:7.2f} ms   max {timings[-1] * 1000:7.2f} ms")
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,126 @@
+"""Latency of tag pages as the catalogue grows around a tag of fixed size.
+
+Grows the courses table in steps up to 100k rows. Two niche tags keep the
+same NICHE courses at every size (half of them carry both), while every
+other course gets random tags from a large pool, so the niche pages should
+cost the same at 10k courses as at 100k. Times the first page of one tag,
+any of two tags, all of two tags, and a page deep into a popular tag.
+
+Point DATABASE_URL at an empty, migrated database (`alembic upgrade head`):
+the script inserts 100k+ rows and does not clean up.
+
+    python -m benchmarks.tag_pages
+"""
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlmodel import select
+
+from app.db.main import engine, Session
+from app.models import User, Course, CourseTag, Tag, TagMatch
+from app.service import CourseTagService
+from app.utils import encode_cursor
+
+SIZES = [10000, 50000, 100000]
+AUTHORS = 50
+TAGS = 200
+NICHE = 60
+LIMIT = 20
+REPEATS = 20
+# Tags 1 and 2 are the niche tags, tag 3 is on every tenth course
+NICHE_TAGS = [1, 2]
+POPULAR_TAG = 3
+
+
+async def seed(authors, start, stop, now):
+    courses = [{
+        'uid': uuid.uuid4(),
+        'title': f"Course {i}",
+        'description': 'A short description of the course.',
+        'type': 'article',
+        'courses': {'sections': [{'heading': 'Introduction', 'body': 'Lorem ipsum ' * 20}]},
+        'created_at': now + timedelta(seconds=i),
+        'updated_at': now,
+        'user_uid': random.choice(authors),
+    } for i in range(start, stop)]
+
+    course_tags = []
+    for i, course in enumerate(courses, start):
+        tag_ids = set(random.sample(range(POPULAR_TAG + 1, TAGS + 1), 3))
+        if i % 10 == 0:
+            tag_ids.add(POPULAR_TAG)
+        if i < NICHE:
+            tag_ids.update(NICHE_TAGS if i % 2 else NICHE_TAGS[:1])
+        course_tags.extend({'course_uid': course['uid'], 'tag_id': tag_id} for tag_id in tag_ids)
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(Course), courses)
+        await conn.execute(insert(CourseTag), course_tags)
+        for table in ('courses', 'course_tags'):
+            await conn.exec_driver_sql(f"ANALYZE {table}")
+
+
+async def measure(tag_ids, cursor=None, tag_match=TagMatch.ANY):
+    latencies = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        async with Session() as session:
+            page = await CourseTagService().get_all_tag_courses(tag_ids, session, cursor=cursor, limit=LIMIT, tag_match=tag_match)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1e3, len(page['courses'])
+
+
+async def main():
+    now = datetime.now()
+    users = [{
+        'uid': uuid.uuid4(),
+        'first_name': 'First',
+        'last_name': 'Last',
+        'email': f"author{i}@example.com",
+        'password': 'x',
+        'role': 'editor',
+        'is_verified': True,
+        'is_premium': False,
+        'created_at': now,
+        'updated_at': now,
+    } for i in range(AUTHORS)]
+    authors = [user['uid'] for user in users]
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), users)
+        await conn.execute(insert(Tag), [{'id': i, 'name': f"tag{i}"} for i in range(1, TAGS + 1)])
+
+    print(f"{'courses':>8} {'query':<22} {'p50 ms':>8} {'rows':>5}")
+    seeded = 0
+    for size in SIZES:
+        await seed(authors, seeded, size, now)
+        seeded = size
+
+        async with Session() as session:
+            middle = (await session.exec(
+                select(Course.created_at, Course.uid)
+                .where(Course.uid.in_(select(CourseTag.course_uid).where(CourseTag.tag_id == POPULAR_TAG)))
+                .order_by(Course.created_at, Course.uid)
+                .offset(size // 20).limit(1)
+            )).one()
+
+        queries = [
+            ('one niche tag', NICHE_TAGS[:1], None, TagMatch.ANY),
+            ('any of two', NICHE_TAGS, None, TagMatch.ANY),
+            ('all of two', NICHE_TAGS, None, TagMatch.ALL),
+            ('popular, middle', [POPULAR_TAG], encode_cursor(middle[0].isoformat(), middle[1]), TagMatch.ANY),
+        ]
+        for name, tag_ids, cursor, tag_match in queries:
+            p50, rows = await measure(tag_ids, cursor, tag_match)
+            print(f"{size:>8} {name:<22} {p50:8.2f} {rows:>5}")
+
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
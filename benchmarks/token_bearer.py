@@ -0,0 +1,86 @@
+"""Counts JWT verifications per request and times the bearer dependency.
+
+Sends the same admin token to GET /api/v1/admin/db/pool, whose role check
+and revocation check both need the claims, and counts jwt.decode
+calls: one for the first request, none for the repeats. Then times the
+bearer itself against the old path, which decoded the token twice in each
+dependency that instantiated its own bearer.
+
+Point DATABASE_URL at a migrated database (`alembic upgrade head`):
+
+    python -m benchmarks.token_bearer
+"""
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+from starlette.requests import Request
+
+from app import utils
+from app.dependencies import access_token_bearer
+from app.main import app
+from app.utils import create_access_token, decode_token
+
+REQUESTS = 20000
+# The role check and the revocation check each built their own AccessTokenBearer, which decoded twice
+OLD_DECODES_PER_REQUEST = 2 * 2
+
+
+def request_with(token):
+    return Request({'type': 'http', 'headers': [(b'authorization', f"Bearer {token}".encode())]})
+
+
+async def time_per_call(call, requests):
+    samples = []
+    for request in requests:
+        start = time.perf_counter()
+        await call(request)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+async def main():
+    token = create_access_token(user_data={'email': 'admin@example.com', 'user_uid': str(uuid.uuid4()), 'role': 'admin'})
+
+    decodes = 0
+    jwt_decode = utils.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        nonlocal decodes
+        decodes += 1
+        return jwt_decode(*args, **kwargs)
+
+    utils.jwt.decode = counting_decode
+    counts = []
+    transport = httpx.ASGITransport(app=app)
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            for _ in range(3):
+                decodes = 0
+                response = await client.get('/api/v1/admin/db/pool', headers={'Authorization': f"Bearer {token}"})
+                assert response.status_code == 200, response.text
+                counts.append(decodes)
+    utils.jwt.decode = jwt_decode
+    print(f"jwt.decode calls for three requests with one token: {counts}")
+
+    async def old_bearer(request):
+        for _ in range(OLD_DECODES_PER_REQUEST):
+            decode_token(request.headers['authorization'].split()[1])
+
+    requests = [request_with(token) for _ in range(REQUESTS)]
+    fresh = [request_with(create_access_token(user_data={'email': 'a@b.c', 'user_uid': str(uuid.uuid4()), 'role': 'user'})) for _ in range(2000)]
+    print(f"old bearer, {OLD_DECODES_PER_REQUEST} decodes  {await time_per_call(old_bearer, requests):7.1f} us/request")
+    print(f"shared bearer, new token    {await time_per_call(access_token_bearer, fresh):7.1f} us/request")
+    print(f"shared bearer, cached token {await time_per_call(access_token_bearer, requests):7.1f} us/request")
+
+    if counts != [1, 0, 0]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
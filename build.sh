@@ -1 +1 @@
-uvicorn app.main:app --host 0.0.0.0 --port $PORT
\ No newline at end of file
+alembic upgrade head && uvicorn app.main:app --host 0.0.0.0 --port $PORT
\ No newline at end of file
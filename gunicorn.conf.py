@@ -0,0 +1,20 @@
+"""Pre-fork deployment: the app and its dictionary are loaded once in the master process.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Workers are forked after the dictionary store is mapped and every index is
+built, so they share one read-only copy instead of each loading their own.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+
+
+def when_ready(server):
+    from app.dictionary.main import preload_dictionary
+
+    preload_dictionary()
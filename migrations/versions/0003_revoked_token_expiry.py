@@ -0,0 +1,49 @@
+"""revoked token expiry
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 15:02:11.412730
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Access tokens live an hour, so rows revoked before this migration can go an hour after it
+LEGACY_EXPIRY = 3600
+
+
+def batch_alter_revokedtoken():
+    # SQLite reflects the UUID column as NUMERIC, which would mangle it when batch mode copies the table
+    return op.batch_alter_table('revokedtoken', reflect_args=[sa.Column('tokenid', sa.UUID(), primary_key=True, nullable=False)])
+
+
+def upgrade() -> None:
+    with batch_alter_revokedtoken() as batch_op:
+        batch_op.add_column(sa.Column('revoked_at', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False))
+        batch_op.add_column(sa.Column('expires_at', sa.BigInteger(), nullable=True))
+
+    op.execute(sa.text('UPDATE revokedtoken SET expires_at = :expires_at').bindparams(expires_at=int(time.time()) + LEGACY_EXPIRY))
+
+    with batch_alter_revokedtoken() as batch_op:
+        batch_op.alter_column('expires_at', existing_type=sa.BigInteger(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_revokedtoken_expires_at'), ['expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_revokedtoken_revoked_at'), ['revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    with batch_alter_revokedtoken() as batch_op:
+        batch_op.drop_index(batch_op.f('ix_revokedtoken_revoked_at'))
+        batch_op.drop_index(batch_op.f('ix_revokedtoken_expires_at'))
+        batch_op.drop_column('expires_at')
+        batch_op.drop_column('revoked_at')
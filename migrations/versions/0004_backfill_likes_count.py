@@ -0,0 +1,31 @@
+"""backfill likes count
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 16:10:42.183305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # likes_count was never written before; from here on likes keep it up to date
+    op.execute(
+        'UPDATE courses SET likes_count = '
+        '(SELECT count(*) FROM likes WHERE likes.course_uid = courses.uid)'
+    )
+
+
+def downgrade() -> None:
+    pass
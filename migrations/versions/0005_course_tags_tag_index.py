@@ -0,0 +1,27 @@
+"""course tags tag index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 17:02:18.504913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_course_tags_tag_id_course_uid', 'course_tags', ['tag_id', 'course_uid'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_course_tags_tag_id_course_uid', table_name='course_tags')
@@ -0,0 +1,28 @@
+"""tag updated at
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 18:21:47.630158
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tags', sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tags', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
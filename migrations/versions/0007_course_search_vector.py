@@ -0,0 +1,41 @@
+"""course search vector
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 19:05:33.917262
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres only: other databases are searched by the pure-Python engine in app/search.py.
+    # The column is generated, so every insert and update keeps it current without application code
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        "ALTER TABLE courses ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B') || "
+        "setweight(jsonb_to_tsvector('english'::regconfig, coalesce(courses, '{}'::jsonb), '[\"string\"]'), 'C')"
+        ") STORED"
+    )
+    op.create_index('ix_courses_search_vector', 'courses', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_courses_search_vector', table_name='courses', postgresql_using='gin')
+    op.drop_column('courses', 'search_vector')